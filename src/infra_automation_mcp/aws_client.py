@@ -1,8 +1,13 @@
 """AWS API Client for EKS and IAM Operations"""
 
+import asyncio
+import functools
 import os
+import threading
+import time
 import boto3
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional
 from botocore.exceptions import ClientError
 
 
@@ -12,15 +17,105 @@ class AWSError(Exception):
         super().__init__(self.message)
 
 
+# Process-wide boto3 caches. Clients are thread-safe once built, but sessions
+# are not, so creation is serialised behind one lock per session.
+_sessions: dict = {}
+_clients: dict = {}
+_session_locks: dict = {}
+_cache_lock = threading.Lock()
+
+# Assumed-role sessions are renewed this many seconds before they expire
+_REFRESH_MARGIN = 300
+
+
+def _session_is_fresh(entry: Optional[tuple]) -> bool:
+    return entry is not None and (entry[1] is None or entry[1] - time.time() > _REFRESH_MARGIN)
+
+
+def _session_lock(key: tuple) -> threading.Lock:
+    with _cache_lock:
+        return _session_locks.setdefault(key, threading.Lock())
+
+
+def _get_session(profile: Optional[str], role_arn: Optional[str]):
+    """Return a fresh boto3 session, assuming `role_arn` on top of `profile` if given."""
+    key = (profile, role_arn)
+    entry = _sessions.get(key)
+    if _session_is_fresh(entry):
+        return entry[0]
+    with _session_lock(key):
+        entry = _sessions.get(key)
+        if _session_is_fresh(entry):
+            return entry[0]
+        if role_arn is None:
+            entry = (boto3.session.Session(profile_name=profile), None)
+        else:
+            sts = get_boto3_client("sts", os.getenv("AWS_REGION", "us-east-1"), profile)
+            creds = sts.assume_role(
+                RoleArn=role_arn,
+                RoleSessionName=os.getenv("AWS_ROLE_SESSION_NAME", "infra-automation-mcp")
+            )["Credentials"]
+            session = boto3.session.Session(
+                aws_access_key_id=creds["AccessKeyId"],
+                aws_secret_access_key=creds["SecretAccessKey"],
+                aws_session_token=creds["SessionToken"]
+            )
+            entry = (session, creds["Expiration"].timestamp())
+        with _cache_lock:
+            # Clients built from the previous credentials must not outlive them
+            for client_key in [k for k in _clients if k[2:] == key]:
+                del _clients[client_key]
+            _sessions[key] = entry
+        return entry[0]
+
+
+def get_boto3_client(service: str, region: str, profile: Optional[str] = None, role_arn: Optional[str] = None):
+    """Return a cached boto3 client for (service, region, profile, role), creating it on first use."""
+    key = (service, region, profile, role_arn)
+    client = _clients.get(key)
+    if client is not None and _session_is_fresh(_sessions.get((profile, role_arn))):
+        return client
+    session = _get_session(profile, role_arn)
+    with _session_lock((profile, role_arn)):
+        client = _clients.get(key)
+        if client is None:
+            client = session.client(service, region_name=region)
+            with _cache_lock:
+                _clients[key] = client
+    return client
+
+
 class AWSClient:
-    """Client for AWS operations - EKS, IAM, EC2."""
+    """Client for AWS operations - EKS, IAM, EC2.
+
+    boto3 clients are created lazily and shared process-wide, so constructing
+    an AWSClient is free and a tool only pays for the services it touches.
+    Pass `role_arn` to operate in another account via sts:AssumeRole.
+    """
     
-    def __init__(self):
-        self.region = os.getenv("AWS_REGION", "us-east-1")
-        self.eks = boto3.client("eks", region_name=self.region)
-        self.iam = boto3.client("iam", region_name=self.region)
-        self.ec2 = boto3.client("ec2", region_name=self.region)
-        self.sts = boto3.client("sts", region_name=self.region)
+    def __init__(self, region: str = None, profile: str = None, role_arn: str = None):
+        self.region = region or os.getenv("AWS_REGION", "us-east-1")
+        self.profile = profile or os.getenv("AWS_PROFILE") or None
+        self.role_arn = role_arn
+
+    def _client(self, service: str):
+        return get_boto3_client(service, self.region, self.profile, self.role_arn)
+
+    @property
+    def eks(self):
+        return self._client("eks")
+
+    @property
+    def iam(self):
+        return self._client("iam")
+
+    @property
+    def ec2(self):
+        return self._client("ec2")
+
+    @property
+    def sts(self):
+        return self._client("sts")
 
     def get_caller_identity(self) -> dict:
         """Get the current AWS identity."""
@@ -38,8 +133,11 @@ class AWSClient:
     def list_clusters(self) -> list:
         """List all EKS clusters."""
         try:
-            response = self.eks.list_clusters()
-            return response.get("clusters", [])
+            paginator = self.eks.get_paginator("list_clusters")
+            clusters = []
+            for page in paginator.paginate():
+                clusters.extend(page.get("clusters", []))
+            return clusters
         except ClientError as e:
             raise AWSError(f"Failed to list clusters: {e}")
 
@@ -64,8 +162,11 @@ class AWSClient:
     def list_nodegroups(self, cluster_name: str) -> list:
         """List node groups in an EKS cluster."""
         try:
-            response = self.eks.list_nodegroups(clusterName=cluster_name)
-            return response.get("nodegroups", [])
+            paginator = self.eks.get_paginator("list_nodegroups")
+            nodegroups = []
+            for page in paginator.paginate(clusterName=cluster_name):
+                nodegroups.extend(page.get("nodegroups", []))
+            return nodegroups
         except ClientError as e:
             raise AWSError(f"Failed to list nodegroups: {e}")
 
@@ -144,6 +245,47 @@ class AWSClient:
         except ClientError as e:
             raise AWSError(f"Failed to list users: {e}")
 
+    def get_account_authorization_details(self, include_aws_managed: bool = False) -> dict:
+        """Fetch every IAM user, group, role and policy in a handful of paged calls."""
+        filters = ["User", "Group", "Role", "LocalManagedPolicy"]
+        if include_aws_managed:
+            filters.append("AWSManagedPolicy")
+        try:
+            paginator = self.iam.get_paginator("get_account_authorization_details")
+            details = {"UserDetailList": [], "GroupDetailList": [], "RoleDetailList": [], "Policies": []}
+            for page in paginator.paginate(Filter=filters, PaginationConfig={"PageSize": 1000}):
+                for key in details:
+                    details[key].extend(page.get(key, []))
+            return details
+        except ClientError as e:
+            raise AWSError(f"Failed to get authorization details: {e}")
+
+    def get_managed_policy(self, policy_arn: str) -> dict:
+        """One managed policy with its default version, in the shape of an authorization details `Policies` entry."""
+        try:
+            policy = self.iam.get_policy(PolicyArn=policy_arn)["Policy"]
+            version = self.iam.get_policy_version(PolicyArn=policy_arn, VersionId=policy["DefaultVersionId"])
+            return {
+                "PolicyName": policy["PolicyName"],
+                "Arn": policy["Arn"],
+                "AttachmentCount": policy.get("AttachmentCount", 0),
+                "PolicyVersionList": [{**version["PolicyVersion"], "IsDefaultVersion": True}]
+            }
+        except ClientError as e:
+            raise AWSError(f"Failed to get policy {policy_arn}: {e}")
+
+    def get_credential_report(self, max_wait: float = 60.0) -> bytes:
+        """Generate (if needed) and download the account's IAM credential report as CSV bytes."""
+        try:
+            deadline = time.monotonic() + max_wait
+            while self.iam.generate_credential_report()["State"] != "COMPLETE":
+                if time.monotonic() >= deadline:
+                    raise AWSError("Timed out waiting for the credential report")
+                time.sleep(2)
+            return self.iam.get_credential_report()["Content"]
+        except ClientError as e:
+            raise AWSError(f"Failed to get credential report: {e}")
+
     # EC2/VPC Operations
     def list_vpcs(self) -> list:
         """List VPCs."""
@@ -167,31 +309,146 @@ class AWSClient:
         except ClientError as e:
             raise AWSError(f"Failed to list VPCs: {e}")
 
-    def list_instances(self, filters: list = None) -> list:
-        """List EC2 instances."""
+    @staticmethod
+    def _instance_summary(instance: dict) -> dict:
+        name = ""
+        for tag in instance.get("Tags", []):
+            if tag["Key"] == "Name":
+                name = tag["Value"]
+                break
+        return {
+            "id": instance["InstanceId"],
+            "name": name,
+            "type": instance["InstanceType"],
+            "state": instance["State"]["Name"],
+            "private_ip": instance.get("PrivateIpAddress"),
+            "public_ip": instance.get("PublicIpAddress"),
+            "vpc_id": instance.get("VpcId")
+        }
+
+    def iter_instances(self, state: str = None, tags: dict = None, vpc_id: str = None,
+                       filters: list = None, page_size: int = None, max_items: int = None) -> Iterator[dict]:
+        """Yield EC2 instances page by page with filters applied server-side.
+
+        state/tags/vpc_id become describe_instances Filters; page_size sets
+        MaxResults (5-1000); iteration stops fetching once max_items are yielded.
+        """
+        api_filters = list(filters or [])
+        if state:
+            api_filters.append({"Name": "instance-state-name", "Values": [state]})
+        if vpc_id:
+            api_filters.append({"Name": "vpc-id", "Values": [vpc_id]})
+        for key, value in (tags or {}).items():
+            api_filters.append({"Name": f"tag:{key}", "Values": [value]})
+
+        kwargs = {}
+        if api_filters:
+            kwargs["Filters"] = api_filters
+        if page_size:
+            kwargs["PaginationConfig"] = {"PageSize": max(5, min(page_size, 1000))}
+
         try:
-            kwargs = {}
-            if filters:
-                kwargs["Filters"] = filters
-            response = self.ec2.describe_instances(**kwargs)
-            
-            instances = []
-            for reservation in response["Reservations"]:
-                for instance in reservation["Instances"]:
-                    name = ""
-                    for tag in instance.get("Tags", []):
-                        if tag["Key"] == "Name":
-                            name = tag["Value"]
-                            break
-                    instances.append({
-                        "id": instance["InstanceId"],
-                        "name": name,
-                        "type": instance["InstanceType"],
-                        "state": instance["State"]["Name"],
-                        "private_ip": instance.get("PrivateIpAddress"),
-                        "public_ip": instance.get("PublicIpAddress"),
-                        "vpc_id": instance.get("VpcId")
-                    })
-            return instances
+            paginator = self.ec2.get_paginator("describe_instances")
+            count = 0
+            for page in paginator.paginate(**kwargs):
+                for reservation in page["Reservations"]:
+                    for instance in reservation["Instances"]:
+                        yield self._instance_summary(instance)
+                        count += 1
+                        if max_items is not None and count >= max_items:
+                            return
         except ClientError as e:
-            raise AWSError(f"Failed to list instances: {e}")
\ No newline at end of file
+            raise AWSError(f"Failed to list instances: {e}")
+
+    def list_instances(self, filters: list = None, state: str = None, tags: dict = None,
+                       vpc_id: str = None, limit: int = None) -> list:
+        """List EC2 instances."""
+        page_size = min(limit, 1000) if limit else None
+        return list(self.iter_instances(state=state, tags=tags, vpc_id=vpc_id, filters=filters,
+                                        page_size=page_size, max_items=limit))
+
+
+# Bounded pool that runs blocking boto3 calls off the event loop
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("AWS_MAX_WORKERS", "8")),
+            thread_name_prefix="aws"
+        )
+    return _executor
+
+
+def shutdown_executor() -> None:
+    """Stop the AWS worker pool (called on server shutdown)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+class AsyncAWSClient:
+    """Awaitable facade over AWSClient.
+
+    Every public AWSClient method is exposed as a coroutine that runs on the
+    shared worker pool, so slow boto3 calls never block the event loop.
+    """
+
+    def __init__(self, client: AWSClient = None, executor: ThreadPoolExecutor = None):
+        self._client = client or AWSClient()
+        self._executor = executor
+
+    @property
+    def region(self) -> str:
+        return self._client.region
+
+    @property
+    def profile(self) -> Optional[str]:
+        return self._client.profile
+
+    @property
+    def role_arn(self) -> Optional[str]:
+        return self._client.role_arn
+
+    async def run(self, func, *args, **kwargs):
+        """Run a blocking callable on the AWS worker pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor or _get_executor(), functools.partial(func, *args, **kwargs))
+
+    async def map(self, func, items: list, concurrency: int = 5) -> list:
+        """Call func(item) for every item, at most `concurrency` at once.
+
+        Results come back in the same order as `items`.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def call(item):
+            async with semaphore:
+                return await self.run(func, item)
+        return list(await asyncio.gather(*(call(item) for item in items)))
+
+    async def describe_clusters(self, cluster_names: list, concurrency: int = 5) -> list:
+        """Describe several EKS clusters concurrently, preserving input order."""
+        return await self.map(self._client.describe_cluster, cluster_names, concurrency)
+
+    async def describe_nodegroups(self, cluster_name: str, nodegroup_names: list, concurrency: int = 5) -> list:
+        """Describe a cluster's node groups concurrently, preserving input order."""
+        describe = functools.partial(self._client.describe_nodegroup, cluster_name)
+        return await self.map(describe, nodegroup_names, concurrency)
+
+    async def get_managed_policies(self, policy_arns: list, concurrency: int = 5) -> list:
+        """Fetch several managed policies and their default documents concurrently."""
+        return await self.map(self._client.get_managed_policy, policy_arns, concurrency)
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._client, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def call(*args, **kwargs):
+            return await self.run(attr, *args, **kwargs)
+        return call
@@ -0,0 +1,79 @@
+"""Multi-Region, Multi-Account AWS Inventory"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import product
+from typing import Optional
+
+from infra_automation_mcp.aws_client import AWSClient, AsyncAWSClient
+
+# Calls made against every target, keyed by the result section they fill
+INVENTORY_SECTIONS = ("clusters", "instances", "vpcs")
+
+
+def _split_env(name: str) -> list:
+    return [v.strip() for v in os.getenv(name, "").split(",") if v.strip()]
+
+
+def _account_from_arn(role_arn: Optional[str]) -> str:
+    # arn:aws:iam::123456789012:role/name
+    if role_arn and role_arn.count(":") >= 5:
+        return role_arn.split(":")[4]
+    return "current"
+
+
+def load_targets(regions: list = None, role_arns: list = None) -> list:
+    """Build the region x account matrix.
+
+    Regions default to AWS_INVENTORY_REGIONS (else AWS_REGION); accounts default
+    to AWS_INVENTORY_ROLE_ARNS, with no role meaning the current credentials.
+    """
+    regions = regions or _split_env("AWS_INVENTORY_REGIONS") or [os.getenv("AWS_REGION", "us-east-1")]
+    role_arns = role_arns if role_arns is not None else _split_env("AWS_INVENTORY_ROLE_ARNS")
+    return [
+        {"region": region, "role_arn": role_arn, "account": _account_from_arn(role_arn)}
+        for role_arn, region in product(role_arns or [None], regions)
+    ]
+
+
+async def _collect_target(target: dict, executor: ThreadPoolExecutor) -> dict:
+    aws = AsyncAWSClient(AWSClient(region=target["region"], role_arn=target["role_arn"]), executor=executor)
+    calls = [aws.list_clusters(), aws.list_instances(), aws.list_vpcs()]
+    outcomes = await asyncio.gather(*calls, return_exceptions=True)
+
+    result = dict(target, errors={})
+    for section, outcome in zip(INVENTORY_SECTIONS, outcomes):
+        if isinstance(outcome, Exception):
+            result[section] = []
+            result["errors"][section] = str(outcome)
+        else:
+            result[section] = outcome
+    return result
+
+
+async def collect_inventory(targets: list = None) -> list:
+    """Run every inventory call for every target in parallel.
+
+    A failure only affects its own target/section and is reported under
+    `errors`; the other targets still return their data.
+    """
+    targets = targets or load_targets()
+    workers = int(os.getenv("AWS_INVENTORY_WORKERS", "0")) or len(targets) * len(INVENTORY_SECTIONS)
+    executor = ThreadPoolExecutor(max_workers=min(workers, 64), thread_name_prefix="aws-inventory")
+    try:
+        return list(await asyncio.gather(*(_collect_target(t, executor) for t in targets)))
+    finally:
+        executor.shutdown(wait=False)
+
+
+def merge_inventory(results: list) -> dict:
+    """Flatten per-target results into one list per section, tagging each item."""
+    merged = {section: [] for section in INVENTORY_SECTIONS}
+    for result in results:
+        for section in INVENTORY_SECTIONS:
+            for item in result[section]:
+                if isinstance(item, str):
+                    item = {"name": item}
+                merged[section].append(dict(item, region=result["region"], account=result["account"]))
+    return merged
@@ -0,0 +1,122 @@
+"""In-Process TTL Cache for Read-Only Tool Data"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+# Seconds each resource stays cached, keyed by the first two key parts
+DEFAULT_TTLS = {
+    ("okta", "users"): 120,
+    ("okta", "groups"): 300,
+    ("aws", "iam_roles"): 600,
+    ("aws", "iam_snapshot"): 600,
+    ("aws", "credential_report"): 900,
+    ("aws", "eks_clusters"): 300,
+    ("terraform", "state_identity"): 30,
+}
+
+
+class _LoadAbandoned(Exception):
+    """The caller running a shared load was cancelled; waiters retry it."""
+
+
+class TTLCache:
+    """Size-bounded LRU cache with per-resource TTLs.
+
+    Keys are tuples such as ("okta", "groups", search). `invalidate` drops every
+    key that starts with the given prefix, so write paths can clear a whole
+    resource without knowing which searches were cached. Concurrent misses on
+    the same key share a single load.
+    """
+
+    def __init__(self, max_entries: int = None, default_ttl: float = None, ttls: dict = None):
+        self.max_entries = max_entries or int(os.getenv("CACHE_MAX_ENTRIES", "256"))
+        self.default_ttl = default_ttl if default_ttl is not None else float(os.getenv("CACHE_DEFAULT_TTL", "60"))
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self._entries: OrderedDict = OrderedDict()
+        self._loading: dict[tuple, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def ttl_for(self, key: tuple) -> float:
+        return self.ttls.get(key[:2], self.default_ttl)
+
+    def get(self, key: tuple) -> tuple[bool, Any]:
+        """Return (hit, value) and mark the entry as recently used."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def set(self, key: tuple, value: Any, ttl: float = None) -> None:
+        ttl = self.ttl_for(key) if ttl is None else ttl
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_or_load(self, key: tuple, loader: Callable[[], Awaitable], ttl: float = None) -> Any:
+        """Return the cached value for `key`, awaiting `loader()` on a miss.
+
+        Concurrent misses share one load. If the caller running it is cancelled,
+        the waiters are not: the next one starts the load again.
+        """
+        while True:
+            hit, value = self.get(key)
+            if hit:
+                self.hits += 1
+                return value
+            pending = self._loading.get(key)
+            if pending is None:
+                break
+            try:
+                return await asyncio.shield(pending)
+            except _LoadAbandoned:
+                continue
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.set_exception(_LoadAbandoned())
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else is waiting
+            raise
+        else:
+            # An invalidation during the load means the result may be stale
+            if self._loading.get(key) is future:
+                self.set(key, value, ttl)
+            future.set_result(value)
+            return value
+        finally:
+            if self._loading.get(key) is future:
+                del self._loading[key]
+
+    def invalidate(self, *prefix: str) -> int:
+        """Drop every entry whose key starts with `prefix`. Returns how many were dropped."""
+        size = len(prefix)
+        stale = [k for k in self._entries if k[:size] == prefix]
+        for k in stale:
+            del self._entries[k]
+        for k in [k for k in self._loading if k[:size] == prefix]:
+            del self._loading[k]
+        return len(stale)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._loading.clear()
+
+
+cache = TTLCache()
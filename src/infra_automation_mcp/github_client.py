@@ -1,8 +1,9 @@
 """GitHub API Client for PR and Repository Operations"""
 
 import os
-from typing import Optional
-from github import Github, GithubException
+from collections import OrderedDict
+from typing import Any, Optional
+import httpx
 
 
 class GitHubError(Exception):
@@ -11,151 +12,239 @@ class GitHubError(Exception):
         super().__init__(self.message)
 
 
-class GitHubClient:
-    """Client for GitHub operations - PRs, commits, workflow triggers."""
-    
+class ETagCache:
+    """LRU of GET response bodies keyed by full URL, revalidated with If-None-Match.
+
+    GitHub answers an unchanged resource with 304 Not Modified, which does not
+    count against the rate limit, so polling cached resources is nearly free.
+    """
+
+    def __init__(self, max_entries: int = None):
+        self.max_entries = max_entries or int(os.getenv("GITHUB_ETAG_CACHE_ENTRIES", "512"))
+        self._entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, url: str) -> Optional[tuple]:
+        """(etag, body, next_url) for a URL, if cached."""
+        entry = self._entries.get(url)
+        if entry is not None:
+            self._entries.move_to_end(url)
+        return entry
+
+    def set(self, url: str, etag: str, body: Any, next_url: Optional[str]) -> None:
+        self._entries[url] = (etag, body, next_url)
+        self._entries.move_to_end(url)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+etag_cache = ETagCache()
+
+# Last X-RateLimit-* values seen ("limit", "remaining", "reset"), for rate_limit_note()
+rate_limit_status: dict = {}
+
+
+def rate_limit_note() -> str:
+    """One-line summary of the GitHub quota and ETag cache, or "" before any request."""
+    if "remaining" not in rate_limit_status:
+        return ""
+    return (f"*GitHub API: {rate_limit_status['remaining']}/{rate_limit_status.get('limit', '?')} requests left "
+            f"this hour; {etag_cache.hits} cached (304) responses, {etag_cache.misses} full*")
+
+
+def _build_github_http_client(token: str) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/"),
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28"
+        },
+        timeout=30.0
+    )
+
+
+# Process-wide connection pool, opened and closed by the server lifespan
+_shared_client: Optional[httpx.AsyncClient] = None
+
+
+async def open_github_pool() -> bool:
+    """Open the shared GitHub connection pool. Returns False if GitHub isn't configured."""
+    global _shared_client
+    token = os.getenv("GITHUB_TOKEN", "")
+    if not token:
+        return False
+    if _shared_client is None or _shared_client.is_closed:
+        _shared_client = _build_github_http_client(token)
+    return True
+
+
+async def close_github_pool() -> None:
+    global _shared_client
+    if _shared_client is not None:
+        await _shared_client.aclose()
+        _shared_client = None
+
+
+class AsyncGitHubClient:
+    """Async GitHub REST client for the read-heavy and PR tools.
+
+    Every GET is sent with the ETag of the last response for that URL, and a
+    304 is answered from `etag_cache`. Borrows the shared connection pool when
+    the server has opened one.
+    """
+
     def __init__(self):
         self.token = os.getenv("GITHUB_TOKEN", "")
         self.repo_name = os.getenv("GITHUB_REPO", "")  # format: owner/repo
         if not self.token:
             raise GitHubError("GITHUB_TOKEN must be configured")
-        self.client = Github(self.token)
-        self._repo = None
-
-    @property
-    def repo(self):
-        if not self._repo and self.repo_name:
-            self._repo = self.client.get_repo(self.repo_name)
-        return self._repo
-
-    def create_branch(self, branch_name: str, base_branch: str = "main") -> dict:
-        """Create a new branch from base branch."""
-        try:
-            base_ref = self.repo.get_branch(base_branch)
-            self.repo.create_git_ref(
-                ref=f"refs/heads/{branch_name}",
-                sha=base_ref.commit.sha
-            )
-            return {"success": True, "branch": branch_name, "base": base_branch}
-        except GithubException as e:
-            raise GitHubError(f"Failed to create branch: {e}")
-
-    def create_file(self, path: str, content: str, message: str, branch: str) -> dict:
-        """Create or update a file in the repository."""
-        try:
-            # Check if file exists
-            try:
-                existing = self.repo.get_contents(path, ref=branch)
-                result = self.repo.update_file(
-                    path=path,
-                    message=message,
-                    content=content,
-                    sha=existing.sha,
-                    branch=branch
-                )
-            except GithubException:
-                result = self.repo.create_file(
-                    path=path,
-                    message=message,
-                    content=content,
-                    branch=branch
-                )
-            return {"success": True, "path": path, "sha": result["commit"].sha}
-        except GithubException as e:
-            raise GitHubError(f"Failed to create file: {e}")
-
-    def create_pull_request(self, title: str, body: str, head_branch: str, 
-                            base_branch: str = "main") -> dict:
-        """Create a pull request."""
-        try:
-            pr = self.repo.create_pull(
-                title=title,
-                body=body,
-                head=head_branch,
-                base=base_branch
-            )
-            return {
-                "success": True,
-                "pr_number": pr.number,
-                "url": pr.html_url,
-                "title": title
-            }
-        except GithubException as e:
-            raise GitHubError(f"Failed to create PR: {e}")
-
-    def list_pull_requests(self, state: str = "open") -> list:
-        """List pull requests."""
-        try:
-            prs = self.repo.get_pulls(state=state)
-            return [{
-                "number": pr.number,
-                "title": pr.title,
-                "state": pr.state,
-                "author": pr.user.login,
-                "url": pr.html_url,
-                "created_at": pr.created_at.isoformat()
-            } for pr in prs]
-        except GithubException as e:
-            raise GitHubError(f"Failed to list PRs: {e}")
-
-    def get_pull_request(self, pr_number: int) -> dict:
-        """Get details of a specific PR."""
-        try:
-            pr = self.repo.get_pull(pr_number)
-            return {
-                "number": pr.number,
-                "title": pr.title,
-                "body": pr.body,
-                "state": pr.state,
-                "author": pr.user.login,
-                "url": pr.html_url,
-                "mergeable": pr.mergeable,
-                "files_changed": pr.changed_files,
-                "additions": pr.additions,
-                "deletions": pr.deletions
-            }
-        except GithubException as e:
-            raise GitHubError(f"Failed to get PR: {e}")
-
-    def merge_pull_request(self, pr_number: int, merge_method: str = "squash") -> dict:
-        """Merge a pull request."""
-        try:
-            pr = self.repo.get_pull(pr_number)
-            result = pr.merge(merge_method=merge_method)
-            return {
-                "success": result.merged,
-                "message": result.message,
-                "sha": result.sha
-            }
-        except GithubException as e:
-            raise GitHubError(f"Failed to merge PR: {e}")
-
-    def list_workflow_runs(self, workflow_name: str = None, limit: int = 10) -> list:
-        """List recent workflow runs."""
-        try:
-            if workflow_name:
-                workflow = self.repo.get_workflow(workflow_name)
-                runs = workflow.get_runs()[:limit]
-            else:
-                runs = self.repo.get_workflow_runs()[:limit]
-            
-            return [{
-                "id": run.id,
-                "name": run.name,
-                "status": run.status,
-                "conclusion": run.conclusion,
-                "branch": run.head_branch,
-                "url": run.html_url,
-                "created_at": run.created_at.isoformat()
-            } for run in runs]
-        except GithubException as e:
-            raise GitHubError(f"Failed to list workflows: {e}")
-
-    def trigger_workflow(self, workflow_name: str, ref: str = "main", inputs: dict = None) -> dict:
-        """Trigger a workflow dispatch event."""
-        try:
-            workflow = self.repo.get_workflow(workflow_name)
-            result = workflow.create_dispatch(ref=ref, inputs=inputs or {})
-            return {"success": True, "workflow": workflow_name, "ref": ref}
-        except GithubException as e:
-            raise GitHubError(f"Failed to trigger workflow: {e}")
\ No newline at end of file
+        if not self.repo_name:
+            raise GitHubError("GITHUB_REPO must be configured")
+        self._client: Optional[httpx.AsyncClient] = None
+        self._owns_client = False
+
+    async def __aenter__(self):
+        if _shared_client is not None and not _shared_client.is_closed:
+            self._client = _shared_client
+            self._owns_client = False
+        else:
+            self._client = _build_github_http_client(self.token)
+            self._owns_client = True
+        return self
+
+    async def __aexit__(self, *args):
+        if self._client and self._owns_client:
+            await self._client.aclose()
+        self._client = None
+
+    def _repo_path(self, path: str) -> str:
+        return f"/repos/{self.repo_name}{path}"
+
+    @staticmethod
+    def _record_rate_limit(response: httpx.Response) -> None:
+        for header in ("X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset"):
+            if header in response.headers:
+                rate_limit_status[header[12:].lower()] = int(response.headers[header])
+
+    async def _get_page(self, url: str, params: dict = None) -> tuple[Any, Optional[str]]:
+        """GET one page, revalidating a cached copy. Returns (body, next page URL)."""
+        if not self._client:
+            raise GitHubError("Client not initialized")
+        request = self._client.build_request("GET", url, params=params)
+        key = str(request.url)
+        cached = etag_cache.get(key)
+        if cached:
+            request.headers["If-None-Match"] = cached[0]
+
+        response = await self._client.send(request)
+        self._record_rate_limit(response)
+        if response.status_code == 304 and cached:
+            etag_cache.hits += 1
+            return cached[1], cached[2]
+        if response.status_code != 200:
+            raise GitHubError(f"GET {url} failed: {response.status_code} {response.text[:200]}")
+
+        etag_cache.misses += 1
+        body = response.json()
+        next_url = response.links.get("next", {}).get("url")
+        if "ETag" in response.headers:
+            etag_cache.set(key, response.headers["ETag"], body, next_url)
+        return body, next_url
+
+    async def _get_all(self, url: str, params: dict = None, limit: int = None, key: str = None) -> list:
+        """Follow Link rel="next" pages, each revalidated on its own."""
+        items = []
+        while url:
+            body, url = await self._get_page(url, params)
+            items.extend(body[key] if key else body)
+            params = None  # the next link already carries the query
+            if limit is not None and len(items) >= limit:
+                return items[:limit]
+        return items
+
+    async def _send(self, method: str, path: str, json_data: dict = None) -> Any:
+        if not self._client:
+            raise GitHubError("Client not initialized")
+        response = await self._client.request(method, path, json=json_data)
+        self._record_rate_limit(response)
+        if response.status_code not in (200, 201):
+            raise GitHubError(f"{method} {path} failed: {response.status_code} {response.text[:200]}")
+        return response.json()
+
+    async def list_pull_requests(self, state: str = "open") -> list:
+        prs = await self._get_all(self._repo_path("/pulls"), {"state": state, "per_page": 100})
+        return [{
+            "number": pr["number"],
+            "title": pr["title"],
+            "state": pr["state"],
+            "author": (pr.get("user") or {}).get("login"),
+            "url": pr["html_url"],
+            "created_at": pr["created_at"]
+        } for pr in prs]
+
+    async def list_workflow_runs(self, workflow_name: str = None, limit: int = 10) -> list:
+        path = f"/actions/workflows/{workflow_name}/runs" if workflow_name else "/actions/runs"
+        runs = await self._get_all(self._repo_path(path), {"per_page": min(limit, 100)},
+                                   limit=limit, key="workflow_runs")
+        return [{
+            "id": run["id"],
+            "name": run["name"],
+            "status": run["status"],
+            "conclusion": run["conclusion"],
+            "branch": run["head_branch"],
+            "url": run["html_url"],
+            "created_at": run["created_at"]
+        } for run in runs]
+
+    async def commit_files(self, files: dict, message: str, branch: str, base_branch: str = "main") -> dict:
+        """Commit several files to a branch as a single commit, creating the branch if needed.
+
+        Uses the Git Data API: the file contents go inline in one tree request,
+        so any number of files costs the same five calls (read ref, read commit,
+        create tree, create commit, create/move ref) and triggers CI once.
+        """
+        if not self._client:
+            raise GitHubError("Client not initialized")
+        response = await self._client.get(self._repo_path(f"/git/ref/heads/{branch}"))
+        self._record_rate_limit(response)
+        created = response.status_code == 404
+        if created:
+            response = await self._client.get(self._repo_path(f"/git/ref/heads/{base_branch}"))
+            self._record_rate_limit(response)
+        if response.status_code != 200:
+            raise GitHubError(f"Failed to read branch ref: {response.status_code}")
+        parent_sha = response.json()["object"]["sha"]
+
+        parent = await self._send("GET", self._repo_path(f"/git/commits/{parent_sha}"))
+        tree = await self._send("POST", self._repo_path("/git/trees"), {
+            "base_tree": parent["tree"]["sha"],
+            "tree": [{"path": path, "mode": "100644", "type": "blob", "content": content}
+                     for path, content in files.items()]
+        })
+        commit = await self._send("POST", self._repo_path("/git/commits"), {
+            "message": message, "tree": tree["sha"], "parents": [parent_sha]
+        })
+
+        if created:
+            await self._send("POST", self._repo_path("/git/refs"), {"ref": f"refs/heads/{branch}", "sha": commit["sha"]})
+        else:
+            await self._send("PATCH", self._repo_path(f"/git/refs/heads/{branch}"), {"sha": commit["sha"]})
+        return {"success": True, "branch": branch, "sha": commit["sha"],
+                "files": len(files), "created_branch": created}
+
+    async def create_pull_request(self, title: str, body: str, head_branch: str,
+                                  base_branch: str = "main") -> dict:
+        pr = await self._send("POST", self._repo_path("/pulls"), {
+            "title": title, "body": body, "head": head_branch, "base": base_branch
+        })
+        return {
+            "success": True,
+            "pr_number": pr["number"],
+            "url": pr["html_url"],
+            "title": title
+        }
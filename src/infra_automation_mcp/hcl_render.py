@@ -0,0 +1,392 @@
+"""HCL Rendering - precompiled Terraform templates with a batch API"""
+
+import re
+from functools import lru_cache
+from typing import Callable, Iterable, Iterator
+
+_INVALID_NAME_CHARS = re.compile(r"[^a-z0-9_]")
+_HCL_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n", "\r": "\\r", "\t": "\\t"})
+
+
+@lru_cache(maxsize=65536)
+def resource_name(value: str) -> str:
+    """Terraform identifier for a user, group or role name: "Platform-Devs" -> "platform_devs"."""
+    name = _INVALID_NAME_CHARS.sub("_", value.strip().lower())
+    return name if name[:1].isalpha() or name[:1] == "_" else f"_{name}"
+
+
+def quote(value) -> str:
+    """HCL string literal, escaping quotes and template sequences."""
+    text = str(value).translate(_HCL_ESCAPES).replace("${", "$${").replace("%{", "%%{")
+    return f'"{text}"'
+
+
+def _comment(value) -> str:
+    return " ".join(str(value).split())
+
+
+class HCLTemplate:
+    """A block of HCL with {placeholders}, defined once at import and filled per resource.
+
+    Values are inserted as-is: callers pass identifiers through resource_name()
+    and strings through quote().
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def render(self, **values) -> str:
+        return self.text.format_map(values)
+
+
+OKTA_USER = HCLTemplate('''\
+# Okta User: {display}
+resource "okta_user" "{name}" {{
+  first_name = {first_name}
+  last_name  = {last_name}
+  email      = {email}
+  login      = {email}
+{optional}}}
+''')
+
+OKTA_GROUP_MEMBERSHIP = HCLTemplate('''\
+resource "okta_group_membership" "{name}_{group}" {{
+  group_id = okta_group.{group}.id
+  user_id  = okta_user.{name}.id
+}}
+''')
+
+OKTA_GROUP = HCLTemplate('''\
+# Okta Group: {display}
+resource "okta_group" "{name}" {{
+  name        = {group_name}
+  description = {description}
+}}
+''')
+
+IAM_ROLE = HCLTemplate('''\
+# IAM Role: {display}
+resource "aws_iam_role" "{name}" {{
+  name = {role_name}
+
+  assume_role_policy = jsonencode({{
+    Version = "2012-10-17"
+    Statement = [{{
+      Action = "sts:AssumeRole"
+      Effect = "Allow"
+      Principal = {{
+        Service = {trust_principal}
+      }}
+    }}]
+  }})
+}}
+
+resource "aws_iam_role_policy_attachment" "{name}_policy" {{
+  role       = aws_iam_role.{name}.name
+  policy_arn = {policy_arn}
+}}
+''')
+
+EKS_CLUSTER = HCLTemplate('''\
+# EKS Cluster: {display}
+module "eks_{name}" {{
+  source  = "terraform-aws-modules/eks/aws"
+  version = "~> 19.0"
+
+  cluster_name    = {cluster_name}
+  cluster_version = "1.28"
+
+  vpc_id     = module.vpc.vpc_id
+  subnet_ids = module.vpc.private_subnets
+
+  eks_managed_node_groups = {{
+    general = {{
+      name           = {node_group_name}
+      instance_types = [{instance_type}]
+      min_size       = 1
+      max_size       = {max_size}
+      desired_size   = {desired_size}
+
+      labels = {{
+        Environment = {environment}
+      }}
+    }}
+  }}
+
+  tags = {{
+    Environment = {environment}
+    ManagedBy   = "terraform"
+    Cluster     = {cluster_name}
+  }}
+}}
+
+output "{name}_endpoint" {{
+  value = module.eks_{name}.cluster_endpoint
+}}
+''')
+
+VPC = HCLTemplate('''\
+# VPC: {display}
+module "vpc" {{
+  source  = "terraform-aws-modules/vpc/aws"
+  version = "~> 5.0"
+
+  name = {vpc_name}
+  cidr = {cidr}
+
+  azs             = [{azs}]
+  private_subnets = [{private_subnets}]
+  public_subnets  = [{public_subnets}]
+
+  enable_nat_gateway   = true
+  single_nat_gateway   = true
+  enable_dns_hostnames = true
+
+  tags = {{
+    ManagedBy = "terraform"
+  }}
+}}
+''')
+
+EC2_FREE_TIER = HCLTemplate('''\
+# =============================================================================
+# EC2 Instance - Free Tier Eligible
+# =============================================================================
+
+# Get the latest Amazon Linux 2 AMI (free tier eligible)
+data "aws_ami" "amazon_linux_2" {{
+  most_recent = true
+  owners      = ["amazon"]
+
+  filter {{
+    name   = "name"
+    values = ["amzn2-ami-hvm-*-x86_64-gp2"]
+  }}
+
+  filter {{
+    name   = "virtualization-type"
+    values = ["hvm"]
+  }}
+}}
+
+# Security Group for the EC2 instance
+resource "aws_security_group" "{name}_sg" {{
+  name        = {sg_name}
+  description = {sg_description}
+  vpc_id      = module.vpc.vpc_id
+
+  # SSH access (restrict to your IP in production!)
+  ingress {{
+    from_port   = 22
+    to_port     = 22
+    protocol    = "tcp"
+    cidr_blocks = ["0.0.0.0/0"]  # TODO: Restrict to your IP
+    description = "SSH access"
+  }}
+
+  # Outbound internet access
+  egress {{
+    from_port   = 0
+    to_port     = 0
+    protocol    = "-1"
+    cidr_blocks = ["0.0.0.0/0"]
+  }}
+
+  tags = {{
+    Name        = {sg_name}
+    Environment = {environment}
+    ManagedBy   = "terraform"
+  }}
+}}
+
+# EC2 Instance - t2.micro is free tier eligible
+resource "aws_instance" "{name}" {{
+  ami                    = data.aws_ami.amazon_linux_2.id
+  instance_type          = "t2.micro"  # Free tier eligible!
+  subnet_id              = module.vpc.public_subnets[0]
+  vpc_security_group_ids = [aws_security_group.{name}_sg.id]
+
+  # Enable if you need SSH access
+  # key_name = "your-key-pair-name"
+
+  root_block_device {{
+    volume_size = 8    # GB - Free tier includes 30GB total
+    volume_type = "gp2"
+    encrypted   = true
+  }}
+
+  tags = {{
+    Name        = {instance_name}
+    Environment = {environment}
+    ManagedBy   = "terraform"
+  }}
+}}
+
+# Outputs
+output "{name}_public_ip" {{
+  value       = aws_instance.{name}.public_ip
+  description = {ip_description}
+}}
+
+output "{name}_instance_id" {{
+  value       = aws_instance.{name}.id
+  description = {id_description}
+}}
+''')
+
+IAM_USER_WITH_OKTA = HCLTemplate('''\
+# =============================================================================
+# IAM User with Okta Group Mapping
+# =============================================================================
+
+# IAM Group (maps to Okta group: {okta_display})
+resource "aws_iam_group" "{group}" {{
+  name = {group_name}
+  path = "/users/"
+}}
+
+# IAM Group Policy - Developer Access
+resource "aws_iam_group_policy_attachment" "{group}_policy" {{
+  group      = aws_iam_group.{group}.name
+  policy_arn = "arn:aws:iam::aws:policy/PowerUserAccess"
+}}
+
+# IAM User
+resource "aws_iam_user" "{user}" {{
+  name = {username}
+  path = "/users/"
+
+  tags = {{
+    OktaGroup   = {okta_group_name}
+    ManagedBy   = "terraform"
+    Description = "User synced from Okta"
+  }}
+}}
+
+# Add user to group
+resource "aws_iam_user_group_membership" "{user}_membership" {{
+  user   = aws_iam_user.{user}.name
+  groups = [aws_iam_group.{group}.name]
+}}
+
+# =============================================================================
+# Okta Group (for SAML federation)
+# =============================================================================
+
+resource "okta_group" "{okta_group}" {{
+  name        = {okta_group_name}
+  description = {okta_description}
+}}
+
+# Okta Group Rule - Auto-assign users based on department
+resource "okta_group_rule" "{okta_group}_rule" {{
+  name              = {rule_name}
+  status            = "ACTIVE"
+  group_assignments = [okta_group.{okta_group}.id]
+  expression_type   = "urn:okta:expression:1.0"
+  expression_value  = "user.department==\\"Engineering\\""
+}}
+''')
+
+
+# =============================================================================
+# Single resources
+# =============================================================================
+
+def okta_user(email: str, first_name: str, last_name: str, department: str = None,
+              groups: list = None, title: str = None) -> str:
+    name = resource_name(email)
+    optional = ""
+    if department:
+        optional += f"  department = {quote(department)}\n"
+    if title:
+        optional += f"  title      = {quote(title)}\n"
+    blocks = [OKTA_USER.render(
+        display=_comment(f"{first_name} {last_name}"), name=name, first_name=quote(first_name),
+        last_name=quote(last_name), email=quote(email), optional=optional
+    )]
+    for group in sorted({resource_name(g) for g in groups or []}):
+        blocks.append(OKTA_GROUP_MEMBERSHIP.render(name=name, group=group))
+    return "\n".join(blocks)
+
+
+def okta_group(name: str, description: str = None) -> str:
+    return OKTA_GROUP.render(display=_comment(name), name=resource_name(name), group_name=quote(name),
+                             description=quote(description or name))
+
+
+def iam_role(role_name: str, policy_arn: str, trust_principal: str = "ec2.amazonaws.com") -> str:
+    return IAM_ROLE.render(display=_comment(role_name), name=resource_name(role_name), role_name=quote(role_name),
+                           trust_principal=quote(trust_principal), policy_arn=quote(policy_arn))
+
+
+def eks_cluster(cluster_name: str, environment: str, node_count: int = 2, instance_type: str = "t3.medium") -> str:
+    return EKS_CLUSTER.render(
+        display=_comment(cluster_name), name=resource_name(cluster_name), cluster_name=quote(cluster_name),
+        node_group_name=quote(f"general-{environment}"), instance_type=quote(instance_type),
+        max_size=int(node_count) * 2, desired_size=int(node_count), environment=quote(environment)
+    )
+
+
+def vpc(name: str, cidr: str = "10.0.0.0/16", azs: int = 2, region: str = "us-east-1") -> str:
+    return VPC.render(
+        display=_comment(name), vpc_name=quote(name), cidr=quote(cidr),
+        azs=", ".join(quote(f"{region}{chr(97 + i)}") for i in range(azs)),
+        private_subnets=", ".join(quote(f"10.0.{i + 1}.0/24") for i in range(azs)),
+        public_subnets=", ".join(quote(f"10.0.{i + 101}.0/24") for i in range(azs))
+    )
+
+
+def ec2_free_tier(instance_name: str, environment: str = "dev") -> str:
+    return EC2_FREE_TIER.render(
+        name=resource_name(instance_name), instance_name=quote(instance_name),
+        sg_name=quote(f"{instance_name}-sg"), sg_description=quote(f"Security group for {instance_name}"),
+        environment=quote(environment), ip_description=quote(f"Public IP of {instance_name}"),
+        id_description=quote(f"Instance ID of {instance_name}")
+    )
+
+
+def iam_user_with_okta(username: str, group_name: str, okta_group_name: str) -> str:
+    return IAM_USER_WITH_OKTA.render(
+        okta_display=_comment(okta_group_name), group=resource_name(group_name), group_name=quote(group_name),
+        user=resource_name(username), username=quote(username), okta_group=resource_name(okta_group_name),
+        okta_group_name=quote(okta_group_name),
+        okta_description=quote(f"Maps to AWS IAM group: {group_name}"),
+        rule_name=quote(f"{okta_group_name}-auto-assign")
+    )
+
+
+# =============================================================================
+# Batches
+# =============================================================================
+
+def render_batch(render: Callable[..., str], records: Iterable[dict], key: str) -> Iterator[str]:
+    """Render one block per record, ordered by the resource name derived from `record[key]`.
+
+    Sorting makes the output independent of input order, so regenerating a
+    file from the same data yields no diff. Two records that sanitise to the
+    same resource name would produce invalid HCL; that raises ValueError here,
+    on the call, before anything is written. Blocks are rendered lazily as
+    the returned iterator is consumed.
+    """
+    ordered = sorted(records, key=lambda r: resource_name(r[key]))
+    seen = {}
+    for record in ordered:
+        name = resource_name(record[key])
+        if name in seen:
+            raise ValueError(f"'{record[key]}' and '{seen[name]}' both map to resource name '{name}'")
+        seen[name] = record[key]
+    return (render(**record) for record in ordered)
+
+
+def render_okta_users(users: Iterable[dict]) -> Iterator[str]:
+    """Blocks for okta_user rows (email, first_name, last_name, department, groups, title)."""
+    return render_batch(okta_user, users, "email")
+
+
+def render_okta_groups(groups: Iterable[dict]) -> Iterator[str]:
+    return render_batch(okta_group, groups, "name")
+
+
+def render_iam_roles(roles: Iterable[dict]) -> Iterator[str]:
+    return render_batch(iam_role, roles, "role_name")
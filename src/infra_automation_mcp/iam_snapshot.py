@@ -0,0 +1,164 @@
+"""IAM Authorization Snapshot - indexed view of GetAccountAuthorizationDetails"""
+
+import json
+from typing import Optional
+from urllib.parse import unquote
+
+# AWS managed policies that grant full administrative access
+ADMIN_MANAGED_POLICIES = {"arn:aws:iam::aws:policy/AdministratorAccess"}
+
+
+def _load_document(document) -> dict:
+    """IAM returns policy documents URL-encoded; boto3 usually decodes them already."""
+    if isinstance(document, str):
+        return json.loads(unquote(document))
+    return document or {}
+
+
+def _as_list(value) -> list:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def grants_admin(document: dict) -> bool:
+    """True if any Allow statement grants every action on every resource."""
+    for statement in _as_list(document.get("Statement")):
+        if statement.get("Effect") != "Allow":
+            continue
+        actions = _as_list(statement.get("Action"))
+        resources = _as_list(statement.get("Resource"))
+        if any(a in ("*", "*:*") for a in actions) and "*" in resources:
+            return True
+    return False
+
+
+def missing_aws_managed_policies(details: dict) -> list:
+    """ARNs of AWS managed policies attached to a principal but absent from `Policies`.
+
+    GetAccountAuthorizationDetails only returns documents for the policy scopes
+    it was asked for; fetching every AWS managed policy is over a thousand
+    documents, so only the attached ones are looked up separately.
+    """
+    known = {p["Arn"] for p in details.get("Policies", [])}
+    attached = {
+        p["PolicyArn"]
+        for key in ("UserDetailList", "GroupDetailList", "RoleDetailList")
+        for principal in details.get(key, [])
+        for p in principal.get("AttachedManagedPolicies", [])
+    }
+    return sorted(arn for arn in attached - known if arn.startswith("arn:aws:iam::aws:"))
+
+
+class IAMAuthorizationSnapshot:
+    """In-memory index of every IAM principal and the policies that apply to it.
+
+    Built from one paginated GetAccountAuthorizationDetails sweep, so answering
+    "what can this role do" or "who is an admin" costs no further API calls.
+    """
+
+    def __init__(self, details: dict):
+        self.policies: dict[str, dict] = {}
+        for p in details.get("Policies", []):
+            default = next((v for v in p.get("PolicyVersionList", []) if v.get("IsDefaultVersion")), {})
+            self.policies[p["Arn"]] = {
+                "name": p["PolicyName"],
+                "arn": p["Arn"],
+                "attachment_count": p.get("AttachmentCount", 0),
+                "document": _load_document(default.get("Document"))
+            }
+
+        self.users = {u["UserName"]: self._principal(u, "UserPolicyList", groups=u.get("GroupList", []))
+                      for u in details.get("UserDetailList", [])}
+        self.groups = {g["GroupName"]: self._principal(g, "GroupPolicyList")
+                       for g in details.get("GroupDetailList", [])}
+        self.roles = {r["RoleName"]: self._principal(
+            r, "RolePolicyList",
+            created=r["CreateDate"].isoformat(),
+            description=r.get("Description", ""),
+            trust_policy=_load_document(r.get("AssumeRolePolicyDocument")),
+            last_used=(r.get("RoleLastUsed") or {}).get("LastUsedDate")
+        ) for r in details.get("RoleDetailList", [])}
+
+        for group in self.groups.values():
+            group["members"] = []
+        for name, user in self.users.items():
+            for group in user["groups"]:
+                if group in self.groups:
+                    self.groups[group]["members"].append(name)
+
+    @staticmethod
+    def _principal(detail: dict, inline_key: str, **extra) -> dict:
+        return {
+            "arn": detail["Arn"],
+            "attached": [p["PolicyArn"] for p in detail.get("AttachedManagedPolicies", [])],
+            "inline": {p["PolicyName"]: _load_document(p.get("PolicyDocument"))
+                       for p in detail.get(inline_key, [])},
+            **extra
+        }
+
+    def _collection(self, kind: str) -> dict:
+        collections = {"user": self.users, "group": self.groups, "role": self.roles}
+        if kind not in collections:
+            raise ValueError(f"Unknown principal type '{kind}' (expected user, group or role)")
+        return collections[kind]
+
+    def has_principal(self, kind: str, name: str) -> bool:
+        return name in self._collection(kind)
+
+    def policy_name(self, arn: str) -> str:
+        policy = self.policies.get(arn)
+        return policy["name"] if policy else arn.rsplit("/", 1)[-1]
+
+    def effective_policies(self, kind: str, name: str) -> list:
+        """[(source, policy name, document or None)] for a principal, including group policies for users."""
+        principal = self._collection(kind).get(name)
+        if principal is None:
+            return []
+        sources = [(f"{kind}:{name}", principal)]
+        if kind == "user":
+            sources += [(f"group:{g}", self.groups[g]) for g in principal["groups"] if g in self.groups]
+
+        result = []
+        for source, p in sources:
+            for arn in p["attached"]:
+                policy = self.policies.get(arn)
+                result.append((source, self.policy_name(arn), policy["document"] if policy else None))
+            for policy_name, document in p["inline"].items():
+                result.append((source, policy_name, document))
+        return result
+
+    def admin_grant(self, kind: str, name: str) -> Optional[str]:
+        """Name of the policy that makes a principal an administrator, if any."""
+        principal = self._collection(kind).get(name)
+        if principal is None:
+            return None
+        attached = list(principal["attached"])
+        if kind == "user":
+            for g in principal["groups"]:
+                attached += self.groups.get(g, {}).get("attached", [])
+        for arn in attached:
+            if arn in ADMIN_MANAGED_POLICIES:
+                return self.policy_name(arn)
+        for source, policy_name, document in self.effective_policies(kind, name):
+            if document and grants_admin(document):
+                return policy_name
+        return None
+
+    def admin_principals(self) -> list:
+        """Every user, group and role with full administrative access."""
+        admins = []
+        for kind in ("user", "group", "role"):
+            for name in sorted(self._collection(kind)):
+                via = self.admin_grant(kind, name)
+                if via:
+                    admins.append({"type": kind, "name": name, "via": via})
+        return admins
+
+    def summary(self) -> dict:
+        return {
+            "users": len(self.users),
+            "groups": len(self.groups),
+            "roles": len(self.roles),
+            "policies": len(self.policies)
+        }
@@ -1,10 +1,21 @@
 """Okta API Client for Infrastructure Automation"""
 
+import asyncio
 import os
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Optional
 import httpx
 from dotenv import load_dotenv
 
+from infra_automation_mcp.cache import cache
+from infra_automation_mcp.okta_index import membership_index
+from infra_automation_mcp.okta_ratelimit import rate_limiter
+
+try:
+    import h2  # noqa: F401 - enables httpx HTTP/2 support
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 load_dotenv()
 
 
@@ -15,8 +26,57 @@ class OktaAPIError(Exception):
         super().__init__(self.message)
 
 
+def _build_http_client(base_url: str, api_token: str) -> httpx.AsyncClient:
+    """Create an httpx client with the configured keep-alive limits."""
+    limits = httpx.Limits(
+        max_connections=int(os.getenv("OKTA_MAX_CONNECTIONS", "20")),
+        max_keepalive_connections=int(os.getenv("OKTA_MAX_KEEPALIVE_CONNECTIONS", "10")),
+        keepalive_expiry=float(os.getenv("OKTA_KEEPALIVE_EXPIRY", "30"))
+    )
+    http2 = os.getenv("OKTA_HTTP2", "false").lower() == "true" and HTTP2_AVAILABLE
+    return httpx.AsyncClient(
+        base_url=base_url,
+        headers={
+            "Authorization": f"SSWS {api_token}",
+            "Accept": "application/json",
+            "Content-Type": "application/json"
+        },
+        timeout=30.0,
+        limits=limits,
+        http2=http2
+    )
+
+
+# Process-wide connection pool, opened and closed by the server lifespan
+_shared_client: Optional[httpx.AsyncClient] = None
+
+
+async def open_connection_pool() -> bool:
+    """Open the shared Okta connection pool. Returns False if Okta isn't configured."""
+    global _shared_client
+    base_url = os.getenv("OKTA_BASE_URL", "").rstrip("/")
+    api_token = os.getenv("OKTA_API_TOKEN", "")
+    if not base_url or not api_token:
+        return False
+    if _shared_client is None or _shared_client.is_closed:
+        _shared_client = _build_http_client(base_url, api_token)
+    return True
+
+
+async def close_connection_pool() -> None:
+    """Close the shared Okta connection pool and drop its connections."""
+    global _shared_client
+    if _shared_client is not None:
+        await _shared_client.aclose()
+        _shared_client = None
+
+
 class OktaClient:
-    """Async client for Okta Management API."""
+    """Async client for Okta Management API.
+
+    Borrows the process-wide connection pool when the server has opened one,
+    otherwise falls back to a private client for the lifetime of the context.
+    """
     
     def __init__(self):
         self.base_url = os.getenv("OKTA_BASE_URL", "").rstrip("/")
@@ -24,27 +84,42 @@ class OktaClient:
         if not self.base_url or not self.api_token:
             raise OktaAPIError("OKTA_BASE_URL and OKTA_API_TOKEN must be configured")
         self._client: Optional[httpx.AsyncClient] = None
+        self._owns_client = False
 
     async def __aenter__(self):
-        self._client = httpx.AsyncClient(
-            base_url=self.base_url,
-            headers={
-                "Authorization": f"SSWS {self.api_token}",
-                "Accept": "application/json",
-                "Content-Type": "application/json"
-            },
-            timeout=30.0
-        )
+        if _shared_client is not None and not _shared_client.is_closed:
+            self._client = _shared_client
+            self._owns_client = False
+        else:
+            self._client = _build_http_client(self.base_url, self.api_token)
+            self._owns_client = True
         return self
 
     async def __aexit__(self, *args):
-        if self._client:
+        if self._client and self._owns_client:
             await self._client.aclose()
+        self._client = None
 
-    async def _request(self, method: str, endpoint: str, params: dict = None, json_data: dict = None) -> Any:
+    async def _send(self, method: str, endpoint: str, params: dict = None, json_data: dict = None) -> httpx.Response:
+        """Send a request through the rate-limit scheduler, retrying 429s after the reset."""
         if not self._client:
             raise OktaAPIError("Client not initialized")
-        response = await self._client.request(method, endpoint, params=params, json=json_data)
+        bucket = rate_limiter.bucket_for(endpoint)
+        attempt = 0
+        while True:
+            await bucket.acquire()
+            try:
+                response = await self._client.request(method, endpoint, params=params, json=json_data)
+            finally:
+                await bucket.release()
+            bucket.update(response.status_code, response.headers)
+            if response.status_code != 429 or attempt >= rate_limiter.max_retries:
+                return response
+            await asyncio.sleep(bucket.retry_delay(attempt))
+            attempt += 1
+
+    async def _request(self, method: str, endpoint: str, params: dict = None, json_data: dict = None) -> Any:
+        response = await self._send(method, endpoint, params=params, json_data=json_data)
         if response.status_code in [200, 201]:
             return response.json()
         elif response.status_code == 204:
@@ -52,12 +127,44 @@ class OktaClient:
         else:
             raise OktaAPIError(f"Request failed: {response.status_code}", response.status_code)
 
+    async def _paginate(self, endpoint: str, params: dict = None) -> AsyncIterator[dict]:
+        """Yield records page by page, following Okta's Link rel="next" cursors."""
+        url = endpoint
+        while url:
+            response = await self._send("GET", url, params=params)
+            if response.status_code != 200:
+                raise OktaAPIError(f"Request failed: {response.status_code}", response.status_code)
+            for record in response.json():
+                yield record
+            url = response.links.get("next", {}).get("url")
+            params = None  # the next link already carries the cursor and query
+
+    @staticmethod
+    async def _collect(records: AsyncIterator[dict], limit: Optional[int]) -> list:
+        """Gather up to `limit` records (all if None), stopping the pager early."""
+        items = []
+        try:
+            async for record in records:
+                items.append(record)
+                if limit is not None and len(items) >= limit:
+                    break
+        finally:
+            await records.aclose()
+        return items
+
+    @staticmethod
+    def _page_size(limit: Optional[int], maximum: int) -> int:
+        return min(limit, maximum) if limit else maximum
+
     # User operations
-    async def list_users(self, search: str = None, limit: int = 20) -> list:
-        params = {"limit": limit}
+    def iter_users(self, search: str = None, page_size: int = 200) -> AsyncIterator[dict]:
+        params = {"limit": page_size}
         if search:
             params["search"] = search
-        return await self._request("GET", "/api/v1/users", params=params)
+        return self._paginate("/api/v1/users", params=params)
+
+    async def list_users(self, search: str = None, limit: Optional[int] = 20) -> list:
+        return await self._collect(self.iter_users(search, page_size=self._page_size(limit, 200)), limit)
 
     async def get_user(self, user_id: str) -> dict:
         return await self._request("GET", f"/api/v1/users/{user_id}")
@@ -69,38 +176,106 @@ class OktaClient:
             profile["department"] = department
         if title:
             profile["title"] = title
-        return await self._request("POST", "/api/v1/users", params={"activate": str(activate).lower()}, 
+        user = await self._request("POST", "/api/v1/users", params={"activate": str(activate).lower()}, 
                                    json_data={"profile": profile})
+        cache.invalidate("okta", "users")
+        return user
 
     async def deactivate_user(self, user_id: str) -> dict:
-        return await self._request("POST", f"/api/v1/users/{user_id}/lifecycle/deactivate")
+        result = await self._request("POST", f"/api/v1/users/{user_id}/lifecycle/deactivate")
+        cache.invalidate("okta", "users")
+        return result
+
+    async def get_user_groups(self, user_id: str) -> list:
+        return await self._collect(self._paginate(f"/api/v1/users/{user_id}/groups", params={"limit": 200}), None)
 
     # Group operations
-    async def list_groups(self, search: str = None, limit: int = 20) -> list:
-        params = {"limit": limit}
+    def iter_groups(self, search: str = None, page_size: int = 200, expression: str = None) -> AsyncIterator[dict]:
+        """Iterate groups by name prefix (`search`) or Okta search expression (`expression`)."""
+        params = {"limit": page_size}
         if search:
             params["q"] = search
-        return await self._request("GET", "/api/v1/groups", params=params)
+        if expression:
+            params["search"] = expression
+        return self._paginate("/api/v1/groups", params=params)
+
+    async def list_groups(self, search: str = None, limit: Optional[int] = 20) -> list:
+        return await self._collect(self.iter_groups(search, page_size=self._page_size(limit, 200)), limit)
+
+    async def group_name_index(self) -> dict:
+        """Case-insensitive group name -> id map, cached and dropped on group writes."""
+        async def load():
+            return {g.get("profile", {}).get("name", "").lower(): g.get("id") async for g in self.iter_groups()}
+        return await cache.get_or_load(("okta", "groups", "name_index"), load)
+
+    async def find_group_by_name(self, name: str) -> Optional[dict]:
+        """Exact, case-insensitive name match using Okta's server-side prefix search."""
+        groups = self.iter_groups(search=name)
+        try:
+            async for g in groups:
+                if g.get("profile", {}).get("name", "").lower() == name.lower():
+                    return g
+        finally:
+            await groups.aclose()
+        return None
+
+    async def resolve_group_names(self, names: list) -> tuple[dict, list]:
+        """Resolve group names to ids. Returns ({name: id}, [unresolved names]).
+
+        Names are looked up in the cached index first; misses fall back to an
+        exact server-side search in case the group was created after caching.
+        """
+        index = await self.group_name_index()
+        resolved, misses = {}, []
+        for name in dict.fromkeys(names):
+            group_id = index.get(name.lower())
+            if group_id:
+                resolved[name] = group_id
+            else:
+                misses.append(name)
+        found = await asyncio.gather(*(self.find_group_by_name(name) for name in misses))
+        unresolved = []
+        for name, group in zip(misses, found):
+            if group:
+                resolved[name] = group.get("id")
+            else:
+                unresolved.append(name)
+        return resolved, unresolved
 
     async def get_group(self, group_id: str) -> dict:
         return await self._request("GET", f"/api/v1/groups/{group_id}")
 
     async def create_group(self, name: str, description: str = None) -> dict:
-        return await self._request("POST", "/api/v1/groups", 
-                                   json_data={"profile": {"name": name, "description": description or name}})
+        group = await self._request("POST", "/api/v1/groups", 
+                                    json_data={"profile": {"name": name, "description": description or name}})
+        cache.invalidate("okta", "groups")
+        return group
 
-    async def get_group_members(self, group_id: str) -> list:
-        return await self._request("GET", f"/api/v1/groups/{group_id}/users")
+    def iter_group_members(self, group_id: str, page_size: int = 200) -> AsyncIterator[dict]:
+        return self._paginate(f"/api/v1/groups/{group_id}/users", params={"limit": page_size})
+
+    async def get_group_members(self, group_id: str, limit: Optional[int] = None) -> list:
+        return await self._collect(self.iter_group_members(group_id, page_size=self._page_size(limit, 200)), limit)
 
     async def add_user_to_group(self, group_id: str, user_id: str) -> dict:
-        return await self._request("PUT", f"/api/v1/groups/{group_id}/users/{user_id}")
+        result = await self._request("PUT", f"/api/v1/groups/{group_id}/users/{user_id}")
+        membership_index.record_add(group_id, user_id)
+        return result
 
     async def remove_user_from_group(self, group_id: str, user_id: str) -> dict:
-        return await self._request("DELETE", f"/api/v1/groups/{group_id}/users/{user_id}")
+        result = await self._request("DELETE", f"/api/v1/groups/{group_id}/users/{user_id}")
+        membership_index.record_remove(group_id, user_id)
+        return result
 
     # App operations
-    async def list_apps(self, limit: int = 20) -> list:
-        return await self._request("GET", "/api/v1/apps", params={"limit": limit})
+    def iter_apps(self, page_size: int = 200) -> AsyncIterator[dict]:
+        return self._paginate("/api/v1/apps", params={"limit": page_size})
+
+    async def list_apps(self, limit: Optional[int] = 20) -> list:
+        return await self._collect(self.iter_apps(page_size=self._page_size(limit, 200)), limit)
+
+    def iter_app_users(self, app_id: str, page_size: int = 200) -> AsyncIterator[dict]:
+        return self._paginate(f"/api/v1/apps/{app_id}/users", params={"limit": page_size})
 
     async def get_user_apps(self, user_id: str) -> list:
         return await self._request("GET", f"/api/v1/users/{user_id}/appLinks")
\ No newline at end of file
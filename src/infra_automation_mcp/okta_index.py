@@ -0,0 +1,116 @@
+"""Okta Group Membership Index - reverse lookup of user id -> group ids"""
+
+import asyncio
+import os
+import time
+from typing import Optional
+
+
+class MembershipIndex:
+    """In-memory reverse index of Okta group memberships.
+
+    Entries are either loaded in bulk from every group's member list or per user
+    via the user's groups endpoint, and are kept current by the add/remove hooks
+    in OktaClient. Entries older than `max_age` seconds are treated as missing.
+    """
+
+    def __init__(self, max_age: float = None):
+        self.max_age = max_age if max_age is not None else float(os.getenv("OKTA_INDEX_TTL", "300"))
+        self._user_groups: dict[str, set] = {}
+        self._group_members: dict[str, set] = {}
+        self._group_names: dict[str, str] = {}
+        self._user_loaded_at: dict[str, float] = {}
+        self._built_at: Optional[float] = None
+        self._build_lock = asyncio.Lock()
+
+    def _is_fresh(self, loaded_at: Optional[float]) -> bool:
+        return loaded_at is not None and time.monotonic() - loaded_at < self.max_age
+
+    @property
+    def is_complete(self) -> bool:
+        """True when the index was fully built and has not expired."""
+        return self._is_fresh(self._built_at)
+
+    def clear(self) -> None:
+        self._user_groups.clear()
+        self._group_members.clear()
+        self._group_names.clear()
+        self._user_loaded_at.clear()
+        self._built_at = None
+
+    def _remember_group(self, group: dict) -> str:
+        group_id = group.get("id")
+        self._group_names[group_id] = group.get("profile", {}).get("name", group_id)
+        return group_id
+
+    async def build(self, client) -> None:
+        """Load every group's members from Okta and replace the index.
+
+        Member lists are read concurrently; the rate-limit scheduler bounds how
+        many requests are in flight. The new index is assembled on the side and
+        swapped in whole, so readers never see a half-built one, and concurrent
+        callers share a single build.
+        """
+        async with self._build_lock:
+            if self.is_complete:
+                return
+            groups = [g async for g in client.iter_groups()]
+
+            async def members(group_id: str) -> list:
+                return [m.get("id") async for m in client.iter_group_members(group_id)]
+
+            member_ids = await asyncio.gather(*(members(g.get("id")) for g in groups))
+
+            user_groups, group_members = {}, {}
+            for g, ids in zip(groups, member_ids):
+                group_id = g.get("id")
+                group_members[group_id] = set(ids)
+                for user_id in ids:
+                    user_groups.setdefault(user_id, set()).add(group_id)
+            now = time.monotonic()
+            self._user_groups, self._group_members = user_groups, group_members
+            self._group_names = {g.get("id"): g.get("profile", {}).get("name", g.get("id")) for g in groups}
+            self._user_loaded_at = dict.fromkeys(user_groups, now)
+            self._built_at = now
+
+    async def load_user(self, client, user_id: str) -> list:
+        """Refresh one user's memberships from the per-user groups endpoint."""
+        groups = await client.get_user_groups(user_id)
+        for group_id in self._user_groups.pop(user_id, set()):
+            self._group_members.get(group_id, set()).discard(user_id)
+        for g in groups:
+            self._link(self._remember_group(g), user_id)
+        self._user_loaded_at[user_id] = time.monotonic()
+        return self.groups_for(user_id)
+
+    def _link(self, group_id: str, user_id: str) -> None:
+        self._user_groups.setdefault(user_id, set()).add(group_id)
+        self._group_members.setdefault(group_id, set()).add(user_id)
+
+    def groups_for(self, user_id: str) -> Optional[list]:
+        """Return [{'id', 'name'}] for a user, or None if the user isn't indexed."""
+        if not self.is_complete and not self._is_fresh(self._user_loaded_at.get(user_id)):
+            return None
+        return sorted(
+            ({"id": gid, "name": self._group_names.get(gid, gid)} for gid in self._user_groups.get(user_id, set())),
+            key=lambda g: g["name"].lower()
+        )
+
+    def member_count(self, group_id: str) -> int:
+        return len(self._group_members.get(group_id, set()))
+
+    def group_summaries(self) -> list:
+        """Return [{'id', 'name', 'members'}] for every indexed group, in load order."""
+        return [{"id": gid, "name": name, "members": self.member_count(gid)}
+                for gid, name in self._group_names.items()]
+
+    # Incremental updates, called after successful membership writes
+    def record_add(self, group_id: str, user_id: str) -> None:
+        self._link(group_id, user_id)
+
+    def record_remove(self, group_id: str, user_id: str) -> None:
+        self._user_groups.get(user_id, set()).discard(group_id)
+        self._group_members.get(group_id, set()).discard(user_id)
+
+
+membership_index = MembershipIndex()
@@ -0,0 +1,122 @@
+"""Okta Rate Limit Scheduler - per-endpoint pacing and adaptive concurrency"""
+
+import asyncio
+import os
+import random
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+
+
+def bucket_key(endpoint: str) -> str:
+    """Map a request path onto Okta's rate-limit bucket, e.g. /api/v1/users/{id}."""
+    segments = [s for s in urlsplit(endpoint).path.split("/") if s]
+    key = "/" + "/".join(segments[:3])
+    if len(segments) > 3:
+        key += "/{id}"
+    return key
+
+
+class RateLimitBucket:
+    """Quota and concurrency state for one Okta rate-limit bucket.
+
+    Quota is read from the X-Rate-Limit-* response headers. Concurrency follows
+    additive-increase / multiplicative-decrease: it grows by one after a full
+    window of healthy responses and halves on a 429 or when quota runs low.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, headroom: float):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.headroom = headroom
+        self.concurrency = max(1, max_concurrency // 2)
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at: float = 0.0
+        self._in_flight = 0
+        self._successes = 0
+        self._cond = asyncio.Condition()
+
+    def _reserve(self) -> int:
+        return max(1, int((self.limit or 0) * self.headroom))
+
+    def _pacing_delay(self) -> float:
+        """Seconds to wait so the bucket keeps its headroom until the window resets."""
+        if self.remaining is None:
+            return 0.0
+        wait = self.reset_at - time.time()
+        if wait <= 0:
+            return 0.0
+        if self.remaining - self._in_flight <= self._reserve():
+            return wait + random.uniform(0, 0.25)
+        return 0.0
+
+    async def acquire(self) -> None:
+        async with self._cond:
+            while True:
+                while self._in_flight >= self.concurrency:
+                    await self._cond.wait()
+                delay = self._pacing_delay()
+                if delay <= 0:
+                    break
+                # Sleep outside the lock so responses can still update the quota
+                self._cond.release()
+                try:
+                    await asyncio.sleep(delay)
+                finally:
+                    await self._cond.acquire()
+            self._in_flight += 1
+
+    async def release(self) -> None:
+        async with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def update(self, status_code: int, headers) -> None:
+        """Record quota headers from a response and adapt concurrency."""
+        try:
+            if "X-Rate-Limit-Limit" in headers:
+                self.limit = int(headers["X-Rate-Limit-Limit"])
+            if "X-Rate-Limit-Remaining" in headers:
+                self.remaining = int(headers["X-Rate-Limit-Remaining"])
+            if "X-Rate-Limit-Reset" in headers:
+                self.reset_at = float(headers["X-Rate-Limit-Reset"])
+        except ValueError:
+            pass
+
+        low_quota = self.remaining is not None and self.remaining <= 2 * self._reserve()
+        if status_code == 429 or low_quota:
+            self.concurrency = max(1, self.concurrency // 2)
+            self._successes = 0
+        elif status_code < 400:
+            self._successes += 1
+            if self._successes >= self.concurrency and self.concurrency < self.max_concurrency:
+                self.concurrency += 1
+                self._successes = 0
+
+    def retry_delay(self, attempt: int) -> float:
+        """Seconds to wait before retrying a 429: until reset, else exponential backoff."""
+        wait = self.reset_at - time.time()
+        if wait > 0:
+            return wait + random.uniform(0, 0.5)
+        return min(30.0, 2 ** attempt) + random.uniform(0, 0.5)
+
+
+class RateLimitScheduler:
+    """Process-wide registry of rate-limit buckets shared by every OktaClient."""
+
+    def __init__(self, max_concurrency: int = None, max_retries: int = None, headroom: float = None):
+        self.max_concurrency = max_concurrency or int(os.getenv("OKTA_MAX_CONCURRENCY", "8"))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("OKTA_MAX_RETRIES", "3"))
+        self.headroom = headroom if headroom is not None else float(os.getenv("OKTA_RATE_LIMIT_HEADROOM", "0.1"))
+        self._buckets: dict[str, RateLimitBucket] = {}
+
+    def bucket_for(self, endpoint: str) -> RateLimitBucket:
+        key = bucket_key(endpoint)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = RateLimitBucket(key, self.max_concurrency, self.headroom)
+        return bucket
+
+
+rate_limiter = RateLimitScheduler()
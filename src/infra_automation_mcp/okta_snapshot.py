@@ -0,0 +1,267 @@
+"""Okta Inventory Snapshot - persistent SQLite store with incremental delta sync"""
+
+import asyncio
+import os
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+# Okta's lastUpdated is set server-side; re-read a small window to absorb clock skew
+SYNC_OVERLAP = timedelta(minutes=5)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    login TEXT,
+    email TEXT,
+    first_name TEXT,
+    last_name TEXT,
+    department TEXT,
+    title TEXT,
+    status TEXT,
+    last_updated TEXT
+);
+CREATE INDEX IF NOT EXISTS users_login ON users (login COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS users_email ON users (email COLLATE NOCASE);
+
+CREATE TABLE IF NOT EXISTS groups (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    description TEXT,
+    type TEXT,
+    last_updated TEXT,
+    last_membership_updated TEXT
+);
+
+CREATE TABLE IF NOT EXISTS memberships (
+    group_id TEXT,
+    user_id TEXT,
+    PRIMARY KEY (group_id, user_id)
+);
+CREATE INDEX IF NOT EXISTS memberships_user ON memberships (user_id);
+
+CREATE TABLE IF NOT EXISTS apps (
+    id TEXT PRIMARY KEY,
+    label TEXT,
+    status TEXT
+);
+
+CREATE TABLE IF NOT EXISTS app_assignments (
+    app_id TEXT,
+    user_id TEXT,
+    PRIMARY KEY (app_id, user_id)
+);
+CREATE INDEX IF NOT EXISTS app_assignments_user ON app_assignments (user_id);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def _okta_timestamp(dt: datetime) -> str:
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def _user_row(u: dict) -> tuple:
+    p = u.get("profile", {})
+    return (u.get("id"), p.get("login"), p.get("email"), p.get("firstName"), p.get("lastName"),
+            p.get("department"), p.get("title"), u.get("status"), u.get("lastUpdated"))
+
+
+def _group_row(g: dict) -> tuple:
+    p = g.get("profile", {})
+    return (g.get("id"), p.get("name"), p.get("description"), g.get("type"),
+            g.get("lastUpdated"), g.get("lastMembershipUpdated"))
+
+
+class OktaSnapshot:
+    """On-disk snapshot of Okta users, groups, memberships and app assignments.
+
+    The first sync loads the whole directory. Later syncs only pull users and
+    groups whose lastUpdated / lastMembershipUpdated moved since the previous
+    sync. App assignments have no change filter in Okta and must be re-read per
+    app, so by default they are only pulled on full syncs.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = os.path.expanduser(path or os.getenv(
+            "OKTA_SNAPSHOT_PATH", "~/.cache/infra-automation-mcp/okta-snapshot.db"))
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.executescript(SCHEMA)
+        self._sync_lock = asyncio.Lock()
+
+    def close(self) -> None:
+        self._db.close()
+
+    # -------------------------------------------------------------------------
+    # Sync
+    # -------------------------------------------------------------------------
+
+    def _get_state(self, key: str) -> Optional[str]:
+        row = self._db.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def _set_state(self, key: str, value: str) -> None:
+        self._db.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (key, value))
+
+    async def sync(self, client, full: bool = False, include_apps: Optional[bool] = None) -> dict:
+        """Refresh the snapshot from Okta. Returns counts of what was pulled.
+
+        `include_apps` defaults to True for full syncs and False for delta
+        syncs, where re-reading every app's assignments would cost far more
+        than the changed users and groups.
+        """
+        async with self._sync_lock:
+            started = datetime.now(timezone.utc)
+            last_sync = self._get_state("last_sync")
+            is_full = full or last_sync is None
+            if include_apps is None:
+                include_apps = is_full
+            if is_full:
+                stats = await self._full_sync(client, include_apps)
+            else:
+                since = _okta_timestamp(datetime.fromisoformat(last_sync) - SYNC_OVERLAP)
+                stats = await self._delta_sync(client, since, include_apps)
+            with self._db:
+                self._set_state("last_sync", started.isoformat())
+                if stats["mode"] == "full":
+                    self._set_state("last_full_sync", started.isoformat())
+                if include_apps:
+                    self._set_state("last_apps_sync", started.isoformat())
+                elif stats["mode"] == "full":
+                    self._db.execute("DELETE FROM sync_state WHERE key = 'last_apps_sync'")
+            return stats
+
+    async def _pull_memberships(self, client, group_ids: list) -> list:
+        # Groups are read concurrently; the client's rate-limit scheduler bounds requests in flight
+        async def members(group_id: str) -> list:
+            return [(group_id, m.get("id")) async for m in client.iter_group_members(group_id)]
+
+        pages = await asyncio.gather(*(members(g) for g in group_ids))
+        return [row for rows in pages for row in rows]
+
+    async def _pull_apps(self, client) -> tuple[list, list]:
+        apps = [(a.get("id"), a.get("label"), a.get("status")) async for a in client.iter_apps()]
+
+        async def assigned(app_id: str) -> list:
+            return [(app_id, u.get("id")) async for u in client.iter_app_users(app_id)]
+
+        pages = await asyncio.gather(*(assigned(a[0]) for a in apps))
+        return apps, [row for rows in pages for row in rows]
+
+    async def _full_sync(self, client, include_apps: bool) -> dict:
+        users = [_user_row(u) async for u in client.iter_users()]
+        groups = [_group_row(g) async for g in client.iter_groups()]
+        memberships = await self._pull_memberships(client, [g[0] for g in groups])
+        apps, assignments = await self._pull_apps(client) if include_apps else (None, None)
+
+        with self._db:
+            self._db.execute("DELETE FROM users")
+            self._db.execute("DELETE FROM groups")
+            self._db.execute("DELETE FROM memberships")
+            self._db.executemany("INSERT INTO users VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", users)
+            self._db.executemany("INSERT INTO groups VALUES (?, ?, ?, ?, ?, ?)", groups)
+            self._db.executemany("INSERT OR IGNORE INTO memberships VALUES (?, ?)", memberships)
+            # Without apps, a full rebuild drops the old assignments rather than keep them unrefreshed
+            self._replace_apps(apps or [], assignments or [])
+        return {"mode": "full", "users": len(users), "groups": len(groups),
+                "memberships": len(memberships), "apps": len(apps) if include_apps else 0}
+
+    async def _delta_sync(self, client, since: str, include_apps: bool) -> dict:
+        users = [_user_row(u) async for u in client.iter_users(search=f'lastUpdated gt "{since}"')]
+        groups = [_group_row(g) async for g in client.iter_groups(
+            expression=f'lastUpdated gt "{since}" or lastMembershipUpdated gt "{since}"')]
+        changed = [g[0] for g in groups if g[5] and g[5] > since]
+        memberships = await self._pull_memberships(client, changed)
+        apps, assignments = await self._pull_apps(client) if include_apps else (None, None)
+
+        with self._db:
+            self._db.executemany("INSERT OR REPLACE INTO users VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", users)
+            self._db.executemany("INSERT OR REPLACE INTO groups VALUES (?, ?, ?, ?, ?, ?)", groups)
+            self._db.executemany("DELETE FROM memberships WHERE group_id = ?", [(g,) for g in changed])
+            self._db.executemany("INSERT OR IGNORE INTO memberships VALUES (?, ?)", memberships)
+            if include_apps:
+                self._replace_apps(apps, assignments)
+        return {"mode": "delta", "since": since, "users": len(users), "groups": len(groups),
+                "memberships": len(memberships), "apps": len(apps) if include_apps else 0}
+
+    def _replace_apps(self, apps: list, assignments: list) -> None:
+        self._db.execute("DELETE FROM apps")
+        self._db.execute("DELETE FROM app_assignments")
+        self._db.executemany("INSERT INTO apps VALUES (?, ?, ?)", apps)
+        self._db.executemany("INSERT OR IGNORE INTO app_assignments VALUES (?, ?)", assignments)
+
+    # -------------------------------------------------------------------------
+    # Queries
+    # -------------------------------------------------------------------------
+
+    def freshness(self) -> dict:
+        """When the snapshot was last synced and how much it holds."""
+        last_sync = self._get_state("last_sync")
+        age = None
+        if last_sync:
+            age = (datetime.now(timezone.utc) - datetime.fromisoformat(last_sync)).total_seconds()
+        counts = {t: self._db.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+                  for t in ("users", "groups", "memberships", "apps", "app_assignments")}
+        return {"last_sync": last_sync, "last_full_sync": self._get_state("last_full_sync"),
+                "last_apps_sync": self._get_state("last_apps_sync"), "age_seconds": age, **counts}
+
+    @property
+    def is_empty(self) -> bool:
+        return self._get_state("last_sync") is None
+
+    def find_user(self, identifier: str) -> Optional[dict]:
+        """Look up a user by id, login or email."""
+        row = self._db.execute(
+            "SELECT * FROM users WHERE id = ? OR login = ? COLLATE NOCASE OR email = ? COLLATE NOCASE LIMIT 1",
+            (identifier, identifier, identifier)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def user_groups(self, user_id: str) -> list:
+        rows = self._db.execute(
+            "SELECT g.id, g.name FROM memberships m JOIN groups g ON g.id = m.group_id "
+            "WHERE m.user_id = ? ORDER BY g.name COLLATE NOCASE", (user_id,)
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def user_apps(self, user_id: str) -> list:
+        rows = self._db.execute(
+            "SELECT a.id, a.label FROM app_assignments x JOIN apps a ON a.id = x.app_id "
+            "WHERE x.user_id = ? ORDER BY a.label COLLATE NOCASE", (user_id,)
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def user_status_counts(self) -> dict:
+        rows = self._db.execute("SELECT status, COUNT(*) AS n FROM users GROUP BY status").fetchall()
+        return {r["status"]: r["n"] for r in rows}
+
+    def inactive_users(self, limit: int = 10) -> list:
+        rows = self._db.execute(
+            "SELECT email, status FROM users WHERE status != 'ACTIVE' ORDER BY email LIMIT ?", (limit,)
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def group_member_counts(self, limit: int = 10) -> list:
+        rows = self._db.execute(
+            "SELECT g.id, g.name, COUNT(m.user_id) AS members FROM groups g "
+            "LEFT JOIN memberships m ON m.group_id = g.id "
+            "GROUP BY g.id ORDER BY g.name COLLATE NOCASE LIMIT ?", (limit,)
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+
+_snapshot: Optional[OktaSnapshot] = None
+
+
+def get_snapshot() -> OktaSnapshot:
+    """Return the process-wide snapshot, opening the database on first use."""
+    global _snapshot
+    if _snapshot is None:
+        _snapshot = OktaSnapshot()
+    return _snapshot
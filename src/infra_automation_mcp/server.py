@@ -1,20 +1,48 @@
 """Infrastructure Automation MCP Server - AI-Powered DevOps"""
 
+import os
+import re
 import sys
+import csv
+import io
 import json
+import asyncio
+from contextlib import asynccontextmanager
 from datetime import datetime
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import FastMCP, Context
 from pydantic import BaseModel, Field
 from typing import Optional
 
 # Import our clients
-from infra_automation_mcp.slack_client import SlackClient, SlackError
-from infra_automation_mcp.okta_client import OktaClient, OktaAPIError
+from infra_automation_mcp.cache import cache
+from infra_automation_mcp.slack_client import SlackClient
+from infra_automation_mcp.okta_client import OktaClient, open_connection_pool, close_connection_pool
+from infra_automation_mcp.okta_index import membership_index
+from infra_automation_mcp.okta_snapshot import get_snapshot
+from infra_automation_mcp import hcl_render
 from infra_automation_mcp.terraform_client import TerraformClient, TerraformError
-from infra_automation_mcp.github_client import GitHubClient, GitHubError
-from infra_automation_mcp.aws_client import AWSClient, AWSError
+from infra_automation_mcp.terraform_state import load_state_index
+from infra_automation_mcp.terraform_index import resource_index
+from infra_automation_mcp.terraform_runner import discover_roots, merge_plan_results, plan_all
+from infra_automation_mcp.github_client import AsyncGitHubClient, open_github_pool, close_github_pool, rate_limit_note
+from infra_automation_mcp.aws_client import AsyncAWSClient, shutdown_executor
+from infra_automation_mcp.iam_snapshot import IAMAuthorizationSnapshot, missing_aws_managed_policies
+from infra_automation_mcp.credential_report import analyze_credentials, parse_credential_report
+from infra_automation_mcp.aws_inventory import collect_inventory, load_targets, merge_inventory
+
+@asynccontextmanager
+async def server_lifespan(server: FastMCP):
+    """Keep warm upstream connections for as long as the server runs."""
+    await open_connection_pool()
+    await open_github_pool()
+    try:
+        yield {}
+    finally:
+        await close_connection_pool()
+        await close_github_pool()
+        shutdown_executor()
 
-mcp = FastMCP("infra_automation_mcp")
+mcp = FastMCP("infra_automation_mcp", lifespan=server_lifespan)
 
 # =============================================================================
 # INPUT MODELS
@@ -29,6 +57,12 @@ class CreateUserInput(BaseModel):
     groups: Optional[list] = Field(None, description="Groups to add user to")
     create_pr: bool = Field(True, description="Create a PR with Terraform config")
 
+class BulkCreateUsersInput(BaseModel):
+    users: str = Field(..., description="JSON list of user objects, or CSV with a header row: "
+                                        "email,first_name,last_name,department,title,groups (groups separated by ';')")
+    concurrency: int = Field(5, description="Maximum users created in parallel", ge=1, le=20)
+    generate_terraform: bool = Field(True, description="Write one Terraform file covering every created user")
+
 class CreateGroupInput(BaseModel):
     name: str = Field(..., description="Group name")
     description: Optional[str] = Field(None, description="Group description")
@@ -42,6 +76,11 @@ class CreateEKSClusterInput(BaseModel):
 
 class TerraformPlanInput(BaseModel):
     environment: str = Field(..., description="Environment to plan (dev, prod)")
+    include_output: bool = Field(False, description="Append the raw plan output to the structured summary")
+
+class TerraformPlanAllInput(BaseModel):
+    roots: Optional[list] = Field(None, description="Roots relative to the terraform/ dir (default: every dir with .tf files)")
+    workers: Optional[int] = Field(None, description="Maximum plans run in parallel (default: TERRAFORM_PLAN_WORKERS or 4)", ge=1, le=16)
 
 class TerraformApplyInput(BaseModel):
     environment: str = Field(..., description="Environment to apply (dev, prod)")
@@ -55,6 +94,8 @@ class CreatePRInput(BaseModel):
 
 class AccessReviewInput(BaseModel):
     scope: str = Field("all", description="Scope: 'all', 'okta', 'aws', or specific group/role")
+    use_snapshot: bool = Field(False, description="Answer the Okta section from the local snapshot (see okta_snapshot_sync)")
+    section_timeout: float = Field(120, description="Seconds each section (Okta, AWS) may take before it is reported as unavailable")
 
 # =============================================================================
 # HELPER FUNCTIONS
@@ -63,6 +104,89 @@ class AccessReviewInput(BaseModel):
 def _format_error(e: Exception) -> str:
     return f"Error: {str(e)}"
 
+def _parse_user_rows(data: str) -> list:
+    """Parse bulk user input (JSON list or CSV) into normalised row dicts."""
+    data = data.strip()
+    if data.startswith("["):
+        records = json.loads(data)
+    else:
+        records = list(csv.DictReader(io.StringIO(data)))
+    
+    rows = []
+    for r in records:
+        r = {k.strip(): v.strip() if isinstance(v, str) else v for k, v in r.items() if k}
+        groups = r.get("groups") or []
+        if isinstance(groups, str):
+            groups = [g.strip() for g in groups.split(";") if g.strip()]
+        rows.append({
+            "email": r.get("email"),
+            "first_name": r.get("first_name") or r.get("firstName"),
+            "last_name": r.get("last_name") or r.get("lastName"),
+            "department": r.get("department") or None,
+            "title": r.get("title") or None,
+            "groups": groups
+        })
+    return rows
+
+def _environment_dir(environment: str) -> str:
+    """Resolve an environment name to its Terraform root, e.g. terraform/environments/dev."""
+    if not re.fullmatch(r"[A-Za-z0-9_-]+", environment):
+        raise ValueError(f"Invalid environment name: {environment}")
+    base = os.getenv("TERRAFORM_WORKING_DIR", "terraform")
+    path = os.path.join(base, "environments", environment)
+    if not os.path.isdir(path):
+        raise ValueError(f"No Terraform environment at {path}")
+    return path
+
+def _format_plan_summary(summary, max_changes: int = 50) -> str:
+    totals = summary.totals()
+    lines = [f"**Plan:** {totals['add']} to add, {totals['change']} to change, {totals['destroy']} to destroy"]
+    if not summary.has_changes:
+        lines.append("\nNo changes. Infrastructure matches the configuration.")
+        return "\n".join(lines) + "\n"
+    
+    lines.append("\n| Action | Address | Forces replacement |")
+    lines.append("|--------|---------|--------------------|")
+    for c in summary.changes[:max_changes]:
+        lines.append(f"| {c.action} | `{c.address}` | {', '.join(c.replace_paths) or '-'} |")
+    if len(summary.changes) > max_changes:
+        lines.append(f"\n... and {len(summary.changes) - max_changes} more")
+    
+    outputs = {name: a for name, a in summary.output_changes.items() if a != "no-op"}
+    if outputs:
+        lines.append("\n**Outputs:** " + ", ".join(f"{name} ({a})" for name, a in sorted(outputs.items())))
+    return "\n".join(lines) + "\n"
+
+async def _check_declarations(files: dict) -> tuple[list, list]:
+    """(collision lines, equivalent lines) for proposed .tf files, checked against the terraform/ tree."""
+    await asyncio.to_thread(resource_index.refresh)
+    collisions, equivalents = [], []
+    for path, content in files.items():
+        if not path.endswith(".tf"):
+            continue
+        result = resource_index.check(content, path)
+        for d, existing in result["collisions"]:
+            collisions.append(f"- `{d.address}` ({path}) is already declared in "
+                              + ", ".join(f"`{e.file}:{e.line}`" for e in existing))
+        for d, existing in result["equivalents"]:
+            equivalents.append(f"- `{d.address}` ({path}) matches "
+                               + ", ".join(f"`{e.address}` in `{e.file}`" for e in existing))
+    return collisions, equivalents
+
+def _existing_declarations_note(collisions: list, equivalents: list) -> str:
+    note = ""
+    if collisions:
+        note += "\n### ⚠️ Already Declared in terraform/\n" + "\n".join(collisions) + "\n"
+    if equivalents:
+        note += "\n### ⚠️ Equivalent Configuration Exists\n" + "\n".join(equivalents) + "\n"
+    return note
+
+def _snapshot_freshness_line(freshness: dict) -> str:
+    age = freshness.get('age_seconds')
+    if age is None:
+        return "*Snapshot: never synced*"
+    return f"*Snapshot as of {freshness['last_sync'][:19].replace('T', ' ')} UTC ({int(age // 60)} min old)*"
+
 # =============================================================================
 # OKTA TOOLS
 # =============================================================================
@@ -71,17 +195,20 @@ def _format_error(e: Exception) -> str:
 async def okta_list_users(search: Optional[str] = None, limit: int = 20) -> str:
     """List users in Okta. Optionally search by name or email."""
     try:
-        async with OktaClient() as client:
-            users = await client.list_users(search=search, limit=limit)
-            if not users:
-                return "No users found."
-            
-            lines = [f"## Okta Users ({len(users)} found)\n"]
-            for u in users:
-                p = u.get("profile", {})
-                lines.append(f"- **{p.get('firstName')} {p.get('lastName')}** ({p.get('email')})")
-                lines.append(f"  - Status: {u.get('status')} | Dept: {p.get('department', 'N/A')}")
-            return "\n".join(lines)
+        async def load():
+            async with OktaClient() as client:
+                return await client.list_users(search=search, limit=limit)
+        
+        users = await cache.get_or_load(("okta", "users", search, limit), load)
+        if not users:
+            return "No users found."
+        
+        lines = [f"## Okta Users ({len(users)} found)\n"]
+        for u in users:
+            p = u.get("profile", {})
+            lines.append(f"- **{p.get('firstName')} {p.get('lastName')}** ({p.get('email')})")
+            lines.append(f"  - Status: {u.get('status')} | Dept: {p.get('department', 'N/A')}")
+        return "\n".join(lines)
     except Exception as e:
         return _format_error(e)
 
@@ -89,17 +216,20 @@ async def okta_list_users(search: Optional[str] = None, limit: int = 20) -> str:
 async def okta_list_groups(search: Optional[str] = None) -> str:
     """List groups in Okta. Optionally search by name."""
     try:
-        async with OktaClient() as client:
-            groups = await client.list_groups(search=search)
-            if not groups:
-                return "No groups found."
-            
-            lines = [f"## Okta Groups ({len(groups)} found)\n"]
-            for g in groups:
-                p = g.get("profile", {})
-                lines.append(f"- **{p.get('name')}** ({g.get('id')})")
-                lines.append(f"  - Type: {g.get('type')} | {p.get('description', 'No description')}")
-            return "\n".join(lines)
+        async def load():
+            async with OktaClient() as client:
+                return await client.list_groups(search=search)
+        
+        groups = await cache.get_or_load(("okta", "groups", search), load)
+        if not groups:
+            return "No groups found."
+        
+        lines = [f"## Okta Groups ({len(groups)} found)\n"]
+        for g in groups:
+            p = g.get("profile", {})
+            lines.append(f"- **{p.get('name')}** ({g.get('id')})")
+            lines.append(f"  - Type: {g.get('type')} | {p.get('description', 'No description')}")
+        return "\n".join(lines)
     except Exception as e:
         return _format_error(e)
 
@@ -118,22 +248,27 @@ async def okta_create_user(params: CreateUserInput) -> str:
                 department=params.department,
                 title=params.title
             )
-            results.append(f"## User Created in Okta\n")
+            results.append("## User Created in Okta\n")
             results.append(f"- **Name:** {params.first_name} {params.last_name}")
             results.append(f"- **Email:** {params.email}")
             results.append(f"- **ID:** {user.get('id')}")
             results.append(f"- **Status:** {user.get('status')}")
             
-            # Add to groups if specified
+            # Add to groups if specified; memberships are written concurrently
             if params.groups:
                 user_id = user.get('id')
-                groups = await client.list_groups()
-                for group_name in params.groups:
-                    for g in groups:
-                        if g.get('profile', {}).get('name', '').lower() == group_name.lower():
-                            await client.add_user_to_group(g.get('id'), user_id)
-                            results.append(f"- Added to group: **{group_name}**")
-                            break
+                resolved, unresolved = await client.resolve_group_names(params.groups)
+                outcomes = await asyncio.gather(
+                    *(client.add_user_to_group(group_id, user_id) for group_id in resolved.values()),
+                    return_exceptions=True
+                )
+                for group_name, outcome in zip(resolved, outcomes):
+                    if isinstance(outcome, Exception):
+                        results.append(f"- ⚠️ Failed to add to group **{group_name}**: {outcome}")
+                    else:
+                        results.append(f"- Added to group: **{group_name}**")
+                for group_name in unresolved:
+                    results.append(f"- ⚠️ Group not found: **{group_name}**")
 
         # Generate Terraform config and create PR
         if params.create_pr:
@@ -145,9 +280,88 @@ async def okta_create_user(params: CreateUserInput) -> str:
                 department=params.department,
                 groups=params.groups
             )
-            results.append(f"\n## Terraform Configuration Generated\n")
+            results.append("\n## Terraform Configuration Generated\n")
             results.append(f"`hcl\n{config}\n`")
-            results.append(f"\n*Create a PR to add this to your infrastructure code.*")
+            results.append("\n*Create a PR to add this to your infrastructure code.*")
+        
+        return "\n".join(results)
+    except Exception as e:
+        return _format_error(e)
+
+@mcp.tool(name="okta_bulk_create_users")
+async def okta_bulk_create_users(params: BulkCreateUsersInput) -> str:
+    """Onboard many users at once: create them in Okta with bounded concurrency,
+    add group memberships, and write a single Terraform file for the cohort."""
+    try:
+        rows = _parse_user_rows(params.users)
+        if not rows:
+            return "No users provided."
+        
+        async with OktaClient() as client:
+            # Resolve every group name once for the whole cohort
+            all_groups = [g for row in rows for g in row['groups']]
+            resolved, unresolved = await client.resolve_group_names(all_groups) if all_groups else ({}, [])
+            semaphore = asyncio.Semaphore(params.concurrency)
+            
+            async def onboard(row: dict) -> dict:
+                missing = [f for f in ("email", "first_name", "last_name") if not row[f]]
+                if missing:
+                    return {"status": "failed", "error": f"missing {', '.join(missing)}"}
+                async with semaphore:
+                    # 429s are retried after the reset by the client's rate-limit scheduler
+                    user = await client.create_user(
+                        email=row['email'],
+                        first_name=row['first_name'],
+                        last_name=row['last_name'],
+                        department=row['department'],
+                        title=row['title']
+                    )
+                    group_ids = [resolved[g] for g in row['groups'] if g in resolved]
+                    outcomes = await asyncio.gather(
+                        *(client.add_user_to_group(gid, user.get('id')) for gid in group_ids),
+                        return_exceptions=True
+                    )
+                notes = [f"not found: {g}" for g in row['groups'] if g not in resolved]
+                failed = sum(isinstance(o, Exception) for o in outcomes)
+                if failed:
+                    notes.append(f"{failed} membership(s) failed")
+                return {"status": "created", "id": user.get('id'),
+                        "groups": len(group_ids) - failed, "note": "; ".join(notes)}
+            
+            outcomes = await asyncio.gather(*(onboard(r) for r in rows), return_exceptions=True)
+        
+        created = 0
+        lines = ["| # | Email | Result | Okta ID | Groups | Notes |",
+                 "|---|-------|--------|---------|--------|-------|"]
+        for n, (row, outcome) in enumerate(zip(rows, outcomes), start=1):
+            if isinstance(outcome, Exception):
+                outcome = {"status": "failed", "error": str(outcome)}
+            if outcome['status'] == "created":
+                created += 1
+                lines.append(f"| {n} | {row['email']} | ✅ created | {outcome['id']} | "
+                             f"{outcome['groups']} | {outcome['note'] or '-'} |")
+            else:
+                lines.append(f"| {n} | {row['email'] or '-'} | ❌ failed | - | - | {outcome['error'][:80]} |")
+        
+        results = [f"## Bulk Onboarding: {created}/{len(rows)} users created\n"]
+        if unresolved:
+            results.append(f"**Unresolved groups:** {', '.join(unresolved)}\n")
+        results.extend(lines)
+        
+        if params.generate_terraform and created:
+            results.append("\n## Terraform Configuration\n")
+            # The users already exist in Okta; a Terraform problem must not hide the table above
+            try:
+                tf = TerraformClient()
+                blocks = hcl_render.render_okta_users(
+                    row for row, outcome in zip(rows, outcomes)
+                    if isinstance(outcome, dict) and outcome['status'] == "created"
+                )
+                path, count = tf.write_blocks(f"okta-users-{datetime.now().strftime('%Y%m%d%H%M%S')}.tf", blocks)
+                results.append(f"Wrote {count} users to `{path}`.")
+                results.append("\n*Create a PR to add this file to your infrastructure code.*")
+            except (ValueError, OSError) as e:
+                results.append(f"⚠️ Terraform file not written: {e}")
         
         return "\n".join(results)
     except Exception as e:
@@ -161,7 +375,7 @@ async def okta_create_group(params: CreateGroupInput) -> str:
         
         async with OktaClient() as client:
             group = await client.create_group(name=params.name, description=params.description)
-            results.append(f"## Group Created in Okta\n")
+            results.append("## Group Created in Okta\n")
             results.append(f"- **Name:** {params.name}")
             results.append(f"- **ID:** {group.get('id')}")
             results.append(f"- **Description:** {params.description or 'N/A'}")
@@ -169,7 +383,7 @@ async def okta_create_group(params: CreateGroupInput) -> str:
         if params.create_pr:
             tf = TerraformClient()
             config = tf.generate_okta_group_config(name=params.name, description=params.description)
-            results.append(f"\n## Terraform Configuration\n")
+            results.append("\n## Terraform Configuration\n")
             results.append(f"`hcl\n{config}\n`")
         
         return "\n".join(results)
@@ -184,15 +398,19 @@ async def okta_create_group(params: CreateGroupInput) -> str:
 async def aws_list_eks_clusters() -> str:
     """List all EKS clusters in the AWS account."""
     try:
-        aws = AWSClient()
-        clusters = aws.list_clusters()
+        aws = AsyncAWSClient()
+        
+        async def load():
+            names = await aws.list_clusters()
+            return list(zip(names, await aws.describe_clusters(names)))
+        
+        clusters = await cache.get_or_load(("aws", "eks_clusters", aws.region, aws.profile, aws.role_arn), load)
         
         if not clusters:
             return "No EKS clusters found."
         
         lines = [f"## EKS Clusters ({len(clusters)} found)\n"]
-        for name in clusters:
-            details = aws.describe_cluster(name)
+        for name, details in clusters:
             lines.append(f"### {name}")
             lines.append(f"- **Status:** {details['status']}")
             lines.append(f"- **Version:** {details['version']}")
@@ -207,9 +425,11 @@ async def aws_list_eks_clusters() -> str:
 async def aws_describe_cluster(cluster_name: str) -> str:
     """Get detailed information about an EKS cluster."""
     try:
-        aws = AWSClient()
-        cluster = aws.describe_cluster(cluster_name)
-        nodegroups = aws.list_nodegroups(cluster_name)
+        aws = AsyncAWSClient()
+        cluster, nodegroups = await asyncio.gather(
+            aws.describe_cluster(cluster_name),
+            aws.list_nodegroups(cluster_name)
+        )
         
         lines = [f"## EKS Cluster: {cluster_name}\n"]
         lines.append(f"- **Status:** {cluster['status']}")
@@ -219,8 +439,7 @@ async def aws_describe_cluster(cluster_name: str) -> str:
         lines.append(f"- **Endpoint:** {cluster['endpoint']}")
         lines.append(f"\n### Node Groups ({len(nodegroups)})")
         
-        for ng_name in nodegroups:
-            ng = aws.describe_nodegroup(cluster_name, ng_name)
+        for ng_name, ng in zip(nodegroups, await aws.describe_nodegroups(cluster_name, nodegroups)):
             lines.append(f"\n**{ng_name}**")
             lines.append(f"- Instance Types: {', '.join(ng['instance_types'])}")
             lines.append(f"- Nodes: {ng['desired_size']} (min: {ng['min_size']}, max: {ng['max_size']})")
@@ -234,8 +453,8 @@ async def aws_describe_cluster(cluster_name: str) -> str:
 async def aws_list_iam_roles() -> str:
     """List IAM roles in the AWS account."""
     try:
-        aws = AWSClient()
-        roles = aws.list_roles()
+        aws = AsyncAWSClient()
+        roles = await cache.get_or_load(("aws", "iam_roles", aws.profile, aws.role_arn), aws.list_roles)
         
         # Filter to show relevant roles (not AWS service roles)
         relevant_roles = [r for r in roles if not r['name'].startswith('AWS')][:20]
@@ -250,12 +469,101 @@ async def aws_list_iam_roles() -> str:
     except Exception as e:
         return _format_error(e)
 
+@mcp.tool(name="aws_list_ec2_instances")
+async def aws_list_ec2_instances(state: Optional[str] = None, tag: Optional[str] = None,
+                                 vpc_id: Optional[str] = None, limit: int = 50) -> str:
+    """List EC2 instances, filtered server-side by state, tag ("Key=Value") and VPC."""
+    try:
+        tags = None
+        if tag:
+            key, _, value = tag.partition("=")
+            tags = {key.strip(): value.strip() or "*"}
+        
+        aws = AsyncAWSClient()
+        instances = await aws.list_instances(state=state, tags=tags, vpc_id=vpc_id, limit=limit)
+        
+        if not instances:
+            return "No EC2 instances found."
+        
+        lines = [f"## EC2 Instances ({len(instances)} shown)\n"]
+        for i in instances:
+            lines.append(f"- **{i['name'] or i['id']}** ({i['id']})")
+            lines.append(f"  - Type: {i['type']} | State: {i['state']} | VPC: {i['vpc_id'] or 'N/A'}")
+            lines.append(f"  - Private IP: {i['private_ip'] or 'N/A'} | Public IP: {i['public_ip'] or 'N/A'}")
+        
+        return "\n".join(lines)
+    except Exception as e:
+        return _format_error(e)
+
+@mcp.tool(name="aws_iam_privileges")
+async def aws_iam_privileges(principal: Optional[str] = None, principal_type: str = "role") -> str:
+    """Show IAM administrative principals, or the effective policies of one user/group/role.
+
+    Answers from a bulk GetAccountAuthorizationDetails snapshot instead of per-role calls.
+    """
+    try:
+        aws = AsyncAWSClient()
+        iam = await _load_iam_snapshot(aws)
+        
+        if principal:
+            if not iam.has_principal(principal_type, principal):
+                return f"No IAM {principal_type} named {principal} found."
+            policies = iam.effective_policies(principal_type, principal)
+            lines = [f"## IAM {principal_type.title()}: {principal}\n"]
+            via = iam.admin_grant(principal_type, principal)
+            lines.append(f"- **Administrator:** {'Yes (via ' + via + ')' if via else 'No'}")
+            lines.append(f"\n### Effective Policies ({len(policies)})")
+            for source, name, _ in policies:
+                lines.append(f"- {name} (from {source})")
+            return "\n".join(lines)
+        
+        counts = iam.summary()
+        admins = iam.admin_principals()
+        lines = ["## IAM Authorization Summary\n"]
+        lines.append(f"- **Users:** {counts['users']} | **Groups:** {counts['groups']} | "
+                     f"**Roles:** {counts['roles']} | **Customer Policies:** {counts['policies']}")
+        lines.append(f"\n### Administrative Principals ({len(admins)})")
+        for a in admins:
+            lines.append(f"- **{a['name']}** ({a['type']}) via {a['via']}")
+        return "\n".join(lines)
+    except Exception as e:
+        return _format_error(e)
+
+@mcp.tool(name="aws_credential_report")
+async def aws_credential_report(stale_days: int = 90) -> str:
+    """Audit IAM credential age and last use for every user in the account.
+
+    Built on the IAM credential report, so the whole account costs a constant
+    number of API calls regardless of how many users or keys exist.
+    """
+    try:
+        aws = AsyncAWSClient()
+        findings = await _load_credential_findings(aws, stale_days=stale_days)
+        
+        lines = [f"## IAM Credential Report ({findings['users']} users)\n"]
+        sections = [
+            ("Console Users Without MFA", findings['no_mfa']),
+            (f"Passwords Unused for {stale_days}+ Days", findings['stale_passwords']),
+            (f"Access Keys Unused for {stale_days}+ Days", findings['unused_keys']),
+            (f"Access Keys Not Rotated in {stale_days} Days", findings['unrotated_keys'])
+        ]
+        for title, items in sections:
+            lines.append(f"### {title} ({len(items)})")
+            for item in items[:25]:
+                lines.append(f"- {item}")
+            if len(items) > 25:
+                lines.append(f"- ... and {len(items) - 25} more")
+            lines.append("")
+        return "\n".join(lines)
+    except Exception as e:
+        return _format_error(e)
+
 @mcp.tool(name="aws_get_identity")
 async def aws_get_identity() -> str:
     """Get the current AWS identity (who am I?)."""
     try:
-        aws = AWSClient()
-        identity = aws.get_caller_identity()
+        aws = AsyncAWSClient()
+        identity = await aws.get_caller_identity()
         
         return f"""## AWS Identity
 
@@ -266,10 +574,202 @@ async def aws_get_identity() -> str:
     except Exception as e:
         return _format_error(e)
 
+@mcp.tool(name="aws_inventory")
+async def aws_inventory(regions: Optional[str] = None) -> str:
+    """Inventory EKS clusters, EC2 instances and VPCs across all configured regions and accounts.
+
+    regions: optional comma-separated override of AWS_INVENTORY_REGIONS.
+    """
+    try:
+        region_list = [r.strip() for r in regions.split(",") if r.strip()] if regions else None
+        results = await collect_inventory(load_targets(regions=region_list))
+        merged = merge_inventory(results)
+        
+        lines = [f"## AWS Inventory ({len(results)} targets)\n"]
+        lines.append("| Account | Region | Clusters | Instances | VPCs | Errors |")
+        lines.append("|---------|--------|----------|-----------|------|--------|")
+        for r in results:
+            errors = "; ".join(f"{k}: {v[:60]}" for k, v in r['errors'].items()) or "-"
+            lines.append(f"| {r['account']} | {r['region']} | {len(r['clusters'])} | "
+                         f"{len(r['instances'])} | {len(r['vpcs'])} | {errors} |")
+        
+        lines.append(f"\n### EKS Clusters ({len(merged['clusters'])})")
+        for c in merged['clusters']:
+            lines.append(f"- {c['name']} ({c['account']}/{c['region']})")
+        
+        lines.append(f"\n### EC2 Instances ({len(merged['instances'])})")
+        for i in merged['instances'][:50]:
+            lines.append(f"- {i['name'] or i['id']} ({i['id']}) - {i['type']}, {i['state']} ({i['account']}/{i['region']})")
+        if len(merged['instances']) > 50:
+            lines.append(f"- ... and {len(merged['instances']) - 50} more")
+        
+        return "\n".join(lines)
+    except Exception as e:
+        return _format_error(e)
+
 # =============================================================================
 # TERRAFORM TOOLS
 # =============================================================================
 
+@mcp.tool(name="terraform_plan")
+async def terraform_plan(params: TerraformPlanInput, ctx: Context) -> str:
+    """Run terraform init and plan for an environment, streaming output to the client as it runs."""
+    try:
+        tf = TerraformClient(working_dir=_environment_dir(params.environment))
+        
+        async def forward(line: str):
+            if line.strip():
+                await ctx.info(line)
+        
+        ok, output = await tf.init(on_output=forward)
+        if not ok:
+            return f"## Terraform Init Failed: {params.environment}\n```\n{output}\n```"
+        
+        ok, output = await tf.plan(on_output=forward)
+        plan_log = tf.last_log_path
+        if not ok:
+            return f"""## Terraform Plan: {params.environment}
+
+**Status:** ❌ Plan failed
+
+```
+{output}
+```
+
+*Full log: `{plan_log}`*
+"""
+        
+        result = f"## Terraform Plan: {params.environment}\n\n**Status:** ✅ Plan succeeded\n\n"
+        try:
+            result += _format_plan_summary(await tf.plan_summary())
+            if params.include_output:
+                result += f"\n```\n{output}\n```\n"
+        except (TerraformError, ValueError) as e:
+            # Fall back to the text output if the saved plan can't be rendered as JSON
+            result += f"*Structured summary unavailable ({e})*\n\n```\n{output}\n```\n"
+        result += f"\n*Full log: `{plan_log}`*"
+        return result
+    except TerraformError as e:
+        return _format_error(e) + (f"\n```\n{e.output}\n```" if e.output else "")
+    except Exception as e:
+        return _format_error(e)
+
+@mcp.tool(name="terraform_plan_all")
+async def terraform_plan_all(params: TerraformPlanAllInput, ctx: Context) -> str:
+    """Plan every Terraform root in parallel and summarise the changes across all of them."""
+    try:
+        roots = params.roots or discover_roots()
+        if not roots:
+            return "No Terraform roots found."
+        await ctx.info(f"Planning {len(roots)} roots")
+        results = await plan_all(roots, workers=params.workers)
+        summary = merge_plan_results(results)
+        
+        lines = [
+            "## Terraform Plan: All Roots\n",
+            f"**Roots:** {summary['roots']} | **Changed:** {len(summary['changed'])} | **Failed:** {len(summary['failed'])}",
+            f"**Total:** {summary['add']} to add, {summary['change']} to change, {summary['destroy']} to destroy\n",
+            "| Root | Status | Add | Change | Destroy | Time |",
+            "|------|--------|-----|--------|---------|------|"
+        ]
+        for r in results:
+            c = r['changes'] or {}
+            lines.append(f"| {r['root']} | {r['status']} | {c.get('add', '-')} | {c.get('change', '-')} | "
+                         f"{c.get('destroy', '-')} | {r['seconds']}s |")
+        
+        for r in results:
+            if r['status'] != "ok":
+                tail = "\n".join(r['output'].strip().splitlines()[-20:])
+                lines.append(f"\n### ❌ {r['root']} ({r['status']})\n```\n{tail}\n```\n*Full log: `{r['log']}`*")
+        
+        return "\n".join(lines)
+    except Exception as e:
+        return _format_error(e)
+
+@mcp.tool(name="terraform_state_query")
+async def terraform_state_query(environment: str, address: Optional[str] = None, resource_type: Optional[str] = None,
+                                tag: Optional[str] = None, attribute: Optional[str] = None, limit: int = 50) -> str:
+    """Query Terraform state by address, resource type or tag ("Key" or "Key=Value").
+    
+    With `address` and `attribute` (dotted path, e.g. "private_ip" or "tags.Name")
+    returns that single value. The state is indexed once and reused until its serial changes.
+    """
+    try:
+        tf = TerraformClient(working_dir=_environment_dir(environment))
+        index = await load_state_index(tf)
+        
+        if address:
+            resource = index.get(address)
+            if resource is None:
+                return f"No resource `{address}` in {environment} state."
+            if attribute:
+                try:
+                    value = index.attribute(address, attribute)
+                except KeyError:
+                    return f"`{address}` has no attribute `{attribute}`."
+                return f"`{address}.{attribute}` = `{json.dumps(value, default=str)}`"
+            return f"## {address}\n```json\n{json.dumps(resource.get('values') or {}, indent=2, default=str)}\n```"
+        
+        tag_filter = None
+        if tag:
+            key, _, value = tag.partition("=")
+            tag_filter = (key.strip(), value.strip() or None)
+        
+        if not resource_type and not tag_filter:
+            lines = [f"## Terraform State: {environment}\n"]
+            if index.identity:
+                lines.append(f"*Serial {index.identity[1]} (lineage {index.identity[0][:8]})*\n")
+            for t, n in index.summary().items():
+                lines.append(f"- {t}: {n}")
+            if index.outputs:
+                lines.append("\n### Outputs")
+                lines.extend(f"- {name}: `{json.dumps(v, default=str)}`" for name, v in index.outputs.items())
+            return "\n".join(lines) if len(lines) > 1 else f"No resources in {environment} state."
+        
+        resources = index.find(resource_type, tag_filter)
+        if not resources:
+            return "No matching resources in state."
+        lines = [f"## Matching Resources ({len(resources)})\n"]
+        for r in resources[:limit]:
+            attrs = r.get("values") or {}
+            name = (attrs.get("tags") or {}).get("Name") if isinstance(attrs.get("tags"), dict) else None
+            lines.append(f"- `{r['address']}`" + (f" ({name})" if name else "") + (f" - {attrs['id']}" if attrs.get("id") else ""))
+        if len(resources) > limit:
+            lines.append(f"- ... and {len(resources) - limit} more")
+        return "\n".join(lines)
+    except TerraformError as e:
+        return _format_error(e) + (f"\n```\n{e.output}\n```" if e.output else "")
+    except Exception as e:
+        return _format_error(e)
+
+@mcp.tool(name="terraform_find_declarations")
+async def terraform_find_declarations(address: Optional[str] = None) -> str:
+    """Find where a resource/module/output address is declared under terraform/, or,
+    without an address, report address collisions and duplicated configuration."""
+    try:
+        stats = await asyncio.to_thread(resource_index.refresh)
+        if address:
+            found = resource_index.lookup(address)
+            if not found:
+                return f"`{address}` is not declared in any of {stats['files']} files."
+            lines = [f"## {address}\n"]
+            lines.extend(f"- `{d.file}:{d.line}`" for d in found)
+            return "\n".join(lines)
+        
+        lines = [f"## Terraform Declarations ({stats['files']} files)\n"]
+        collisions = resource_index.collisions()
+        lines.append(f"### Address Collisions ({len(collisions)})")
+        for decls in collisions:
+            lines.append(f"- `{decls[0].address}` in `{decls[0].directory}/`: "
+                         + ", ".join(os.path.basename(d.file) for d in decls))
+        duplicates = resource_index.duplicates()
+        lines.append(f"\n### Duplicated Configuration ({len(duplicates)})")
+        for decls in duplicates:
+            lines.append("- " + ", ".join(f"`{d.address}` ({d.file})" for d in decls))
+        return "\n".join(lines)
+    except Exception as e:
+        return _format_error(e)
+
 @mcp.tool(name="terraform_generate_eks")
 async def terraform_generate_eks(params: CreateEKSClusterInput) -> str:
     """Generate Terraform configuration for a new EKS cluster."""
@@ -331,6 +831,141 @@ async def terraform_generate_iam_role(role_name: str, policy: str = "ReadOnlyAcc
 # COMPLIANCE & REPORTING TOOLS
 # =============================================================================
 
+async def _okta_review_from_snapshot() -> list:
+    """Okta section of the access review, answered from the local snapshot."""
+    snapshot = get_snapshot()
+    freshness = snapshot.freshness()
+    status_counts = snapshot.user_status_counts()
+    active_count = status_counts.get('ACTIVE', 0)
+    
+    lines = [_snapshot_freshness_line(freshness) + "\n"]
+    lines.append("### Users")
+    lines.append(f"- **Total:** {freshness['users']}")
+    lines.append(f"- **Active:** {active_count}")
+    lines.append(f"- **Inactive/Suspended:** {freshness['users'] - active_count}")
+    
+    inactive_users = snapshot.inactive_users(limit=10)
+    if inactive_users:
+        lines.append("\n**Inactive Users (Review Recommended):**")
+        for u in inactive_users:
+            lines.append(f"- {u['email']} - Status: {u['status']}")
+    
+    lines.append("\n### Groups")
+    lines.append(f"- **Total:** {freshness['groups']}")
+    for g in snapshot.group_member_counts(limit=10):
+        lines.append(f"- {g['name']} ({g['members']} members)")
+    return lines
+
+async def _okta_review_live() -> list:
+    """Okta section of the access review, streamed from the live API."""
+    async with OktaClient() as client:
+        async def users_summary() -> list:
+            # Stream every user; only counts and the first few inactive users are kept
+            total_users = 0
+            active_count = 0
+            inactive_users = []
+            async for u in client.iter_users():
+                total_users += 1
+                if u.get('status') == 'ACTIVE':
+                    active_count += 1
+                elif len(inactive_users) < 10:
+                    inactive_users.append(u)
+            
+            lines = ["### Users"]
+            lines.append(f"- **Total:** {total_users}")
+            lines.append(f"- **Active:** {active_count}")
+            lines.append(f"- **Inactive/Suspended:** {total_users - active_count}")
+            if inactive_users:
+                lines.append("\n**Inactive Users (Review Recommended):**")
+                for u in inactive_users:
+                    p = u.get('profile', {})
+                    lines.append(f"- {p.get('email')} - Status: {u.get('status')}")
+            return lines
+        
+        async def groups_summary() -> list:
+            # Building the membership index here also serves later check_user_access calls
+            if not membership_index.is_complete:
+                await membership_index.build(client)
+            groups = membership_index.group_summaries()
+            
+            lines = ["\n### Groups"]
+            lines.append(f"- **Total:** {len(groups)}")
+            for g in groups[:10]:
+                lines.append(f"- {g['name']} ({g['members']} members)")
+            return lines
+        
+        user_lines, group_lines = await asyncio.gather(users_summary(), groups_summary(), return_exceptions=True)
+    if isinstance(user_lines, Exception):
+        raise user_lines
+    if isinstance(group_lines, Exception):
+        group_lines = ["\n### Groups", f"*Group memberships unavailable: {group_lines}*"]
+    return user_lines + group_lines
+
+async def _load_iam_snapshot(aws: AsyncAWSClient) -> IAMAuthorizationSnapshot:
+    async def load():
+        details = await aws.get_account_authorization_details()
+        # Attached AWS managed policies (ReadOnlyAccess, PowerUserAccess, ...) need their documents too
+        details["Policies"] += await aws.get_managed_policies(missing_aws_managed_policies(details))
+        return IAMAuthorizationSnapshot(details)
+    return await cache.get_or_load(("aws", "iam_snapshot", aws.profile, aws.role_arn), load)
+
+async def _load_credential_findings(aws: AsyncAWSClient, stale_days: int = 90) -> dict:
+    # AWS regenerates the report at most every 4 hours, so the raw CSV is cached
+    content = await cache.get_or_load(("aws", "credential_report", aws.profile, aws.role_arn),
+                                      aws.get_credential_report)
+    return analyze_credentials(parse_credential_report(content), stale_days=stale_days)
+
+async def _aws_review() -> list:
+    """AWS section of the access review."""
+    aws = AsyncAWSClient()
+    # Each subsection needs different IAM permissions; one that fails is reported on its own
+    identity, iam, credentials, clusters = await asyncio.gather(
+        aws.get_caller_identity(),
+        _load_iam_snapshot(aws),
+        _load_credential_findings(aws),
+        aws.list_clusters(),
+        return_exceptions=True
+    )
+    
+    lines = ["### Account"]
+    if isinstance(identity, Exception):
+        lines.append(f"*Account identity unavailable: {identity}*")
+    else:
+        lines.append(f"- **Account ID:** {identity['account']}")
+    
+    if isinstance(iam, Exception):
+        lines.append("\n### IAM")
+        lines.append(f"*IAM authorization details unavailable: {iam}*")
+    else:
+        counts = iam.summary()
+        lines.append(f"\n### IAM ({counts['users']} users, {counts['groups']} groups, {counts['roles']} roles)")
+        admins = iam.admin_principals()
+        if admins:
+            lines.append("\n**Administrative Principals (High Privilege):**")
+            for a in admins:
+                lines.append(f"- {a['type']}: {a['name']} (via {a['via']})")
+    
+    if isinstance(credentials, Exception):
+        lines.append("\n### Credential Hygiene")
+        lines.append(f"*Credential report unavailable: {credentials}*")
+    else:
+        lines.append(f"\n### Credential Hygiene ({credentials['users']} users, 90-day threshold)")
+        lines.append(f"- **Console users without MFA:** {len(credentials['no_mfa'])}")
+        lines.append(f"- **Stale passwords:** {len(credentials['stale_passwords'])}")
+        lines.append(f"- **Unused access keys:** {len(credentials['unused_keys'])}")
+        lines.append(f"- **Unrotated access keys:** {len(credentials['unrotated_keys'])}")
+        for user in credentials['no_mfa'][:10]:
+            lines.append(f"  - No MFA: {user}")
+    
+    if isinstance(clusters, Exception):
+        lines.append("\n### EKS Clusters")
+        lines.append(f"*EKS clusters unavailable: {clusters}*")
+    else:
+        lines.append(f"\n### EKS Clusters ({len(clusters)} total)")
+        for c in clusters:
+            lines.append(f"- {c}")
+    return lines
+
 @mcp.tool(name="generate_access_review")
 async def generate_access_review(params: AccessReviewInput) -> str:
     """Generate a comprehensive access review report for compliance (SOC2, ISO27001)."""
@@ -342,61 +977,27 @@ async def generate_access_review(params: AccessReviewInput) -> str:
             "---\n"
         ]
         
-        # Okta Section
+        # Collect every section concurrently; each one is bounded by its own timeout
+        sections = []
         if params.scope in ["all", "okta"]:
-            report.append("## Okta Identity Summary\n")
-            try:
-                async with OktaClient() as client:
-                    users = await client.list_users(limit=100)
-                    groups = await client.list_groups(limit=50)
-                    
-                    active_users = [u for u in users if u.get('status') == 'ACTIVE']
-                    inactive_users = [u for u in users if u.get('status') != 'ACTIVE']
-                    
-                    report.append(f"### Users")
-                    report.append(f"- **Total:** {len(users)}")
-                    report.append(f"- **Active:** {len(active_users)}")
-                    report.append(f"- **Inactive/Suspended:** {len(inactive_users)}")
-                    
-                    if inactive_users:
-                        report.append(f"\n**Inactive Users (Review Recommended):**")
-                        for u in inactive_users[:10]:
-                            p = u.get('profile', {})
-                            report.append(f"- {p.get('email')} - Status: {u.get('status')}")
-                    
-                    report.append(f"\n### Groups")
-                    report.append(f"- **Total:** {len(groups)}")
-                    for g in groups[:10]:
-                        p = g.get('profile', {})
-                        report.append(f"- {p.get('name')}")
-            except Exception as e:
-                report.append(f"*Okta data unavailable: {e}*")
-        
-        # AWS Section
+            okta_section = _okta_review_from_snapshot() if params.use_snapshot else _okta_review_live()
+            sections.append(("## Okta Identity Summary\n", "Okta", okta_section))
         if params.scope in ["all", "aws"]:
-            report.append("\n## AWS Access Summary\n")
-            try:
-                aws = AWSClient()
-                identity = aws.get_caller_identity()
-                roles = aws.list_roles()
-                
-                report.append(f"### Account")
-                report.append(f"- **Account ID:** {identity['account']}")
-                
-                report.append(f"\n### IAM Roles ({len(roles)} total)")
-                admin_roles = [r for r in roles if 'admin' in r['name'].lower()]
-                if admin_roles:
-                    report.append(f"\n**Admin Roles (High Privilege):**")
-                    for r in admin_roles:
-                        report.append(f"- {r['name']}")
-                
-                # EKS Clusters
-                clusters = aws.list_clusters()
-                report.append(f"\n### EKS Clusters ({len(clusters)} total)")
-                for c in clusters:
-                    report.append(f"- {c}")
-            except Exception as e:
-                report.append(f"*AWS data unavailable: {e}*")
+            sections.append(("\n## AWS Access Summary\n", "AWS", _aws_review()))
+        
+        results = await asyncio.gather(
+            *(asyncio.wait_for(section, timeout=params.section_timeout) for _, _, section in sections),
+            return_exceptions=True
+        )
+        
+        for (header, label, _), result in zip(sections, results):
+            report.append(header)
+            if isinstance(result, asyncio.TimeoutError):
+                report.append(f"*{label} data unavailable: timed out after {params.section_timeout}s*")
+            elif isinstance(result, Exception):
+                report.append(f"*{label} data unavailable: {result}*")
+            else:
+                report.extend(result)
         
         report.append("\n---")
         report.append("## Recommendations")
@@ -410,17 +1011,49 @@ async def generate_access_review(params: AccessReviewInput) -> str:
         return _format_error(e)
 
 @mcp.tool(name="check_user_access")
-async def check_user_access(email: str) -> str:
-    """Check all access for a specific user across Okta and AWS."""
+async def check_user_access(email: str, use_snapshot: bool = False) -> str:
+    """Check all access for a specific user across Okta and AWS.
+
+    use_snapshot: answer from the local Okta snapshot instead of live API calls.
+    """
     try:
         report = [f"# Access Report: {email}\n"]
         
         # Okta Access
         report.append("## Okta Access\n")
+        if use_snapshot:
+            try:
+                snapshot = get_snapshot()
+                freshness = snapshot.freshness()
+                report.append(_snapshot_freshness_line(freshness) + "\n")
+                user = snapshot.find_user(email)
+                if not user:
+                    report.append(f"*{email} not found in snapshot*")
+                    return "\n".join(report)
+                
+                report.append(f"- **Name:** {user['first_name']} {user['last_name']}")
+                report.append(f"- **Status:** {user['status']}")
+                report.append(f"- **Department:** {user['department'] or 'N/A'}")
+                report.append(f"- **Title:** {user['title'] or 'N/A'}")
+                
+                user_groups = snapshot.user_groups(user['id'])
+                report.append(f"\n### Groups ({len(user_groups)})")
+                for g in user_groups:
+                    report.append(f"- {g['name']}")
+                
+                apps = snapshot.user_apps(user['id'])
+                report.append(f"\n### Applications ({len(apps)})")
+                if not freshness['last_apps_sync']:
+                    report.append("*App assignments not in snapshot; sync with include_apps=True*")
+                for app in apps:
+                    report.append(f"- {app['label']}")
+            except Exception as e:
+                report.append(f"*Okta snapshot unavailable: {e}*")
+            return "\n".join(report)
+        
         try:
             async with OktaClient() as client:
                 user = await client.get_user(email)
-                groups = await client.list_groups()
                 apps = await client.get_user_apps(user.get('id'))
                 
                 profile = user.get('profile', {})
@@ -429,16 +1062,14 @@ async def check_user_access(email: str) -> str:
                 report.append(f"- **Department:** {profile.get('department', 'N/A')}")
                 report.append(f"- **Title:** {profile.get('title', 'N/A')}")
                 
-                # Get user's groups
-                user_groups = []
-                for g in groups:
-                    members = await client.get_group_members(g.get('id'))
-                    if any(m.get('id') == user.get('id') for m in members):
-                        user_groups.append(g.get('profile', {}).get('name'))
+                # Get user's groups from the membership index (one call on a miss)
+                user_groups = membership_index.groups_for(user.get('id'))
+                if user_groups is None:
+                    user_groups = await membership_index.load_user(client, user.get('id'))
                 
                 report.append(f"\n### Groups ({len(user_groups)})")
                 for g in user_groups:
-                    report.append(f"- {g}")
+                    report.append(f"- {g['name']}")
                 
                 report.append(f"\n### Applications ({len(apps)})")
                 for app in apps:
@@ -450,6 +1081,33 @@ async def check_user_access(email: str) -> str:
     except Exception as e:
         return _format_error(e)
 
+@mcp.tool(name="okta_snapshot_sync")
+async def okta_snapshot_sync(full: bool = False, include_apps: Optional[bool] = None) -> str:
+    """Refresh the local Okta snapshot used by access reviews.
+
+    The first run loads the whole directory; later runs only pull users and groups
+    changed since the previous sync (Okta `lastUpdated gt` filter). Use full=True
+    to rebuild from scratch, which also drops deleted users and groups.
+    App assignments are re-read on full syncs only, unless include_apps says otherwise.
+    """
+    try:
+        snapshot = get_snapshot()
+        async with OktaClient() as client:
+            stats = await snapshot.sync(client, full=full, include_apps=include_apps)
+        freshness = snapshot.freshness()
+        
+        lines = [f"## Okta Snapshot Synced ({stats['mode']})\n"]
+        if stats.get('since'):
+            lines.append(f"- **Changes since:** {stats['since']}")
+        lines.append(f"- **Pulled:** {stats['users']} users, {stats['groups']} groups, "
+                     f"{stats['memberships']} memberships, {stats['apps']} apps")
+        lines.append(f"- **Snapshot totals:** {freshness['users']} users, {freshness['groups']} groups, "
+                     f"{freshness['memberships']} memberships, {freshness['app_assignments']} app assignments")
+        lines.append(f"- **Stored at:** `{snapshot.path}`")
+        return "\n".join(lines)
+    except Exception as e:
+        return _format_error(e)
+
 # =============================================================================
 # PIPELINE TOOLS
 # =============================================================================
@@ -458,26 +1116,23 @@ async def check_user_access(email: str) -> str:
 async def create_infrastructure_pr(params: CreatePRInput) -> str:
     """Create a Pull Request with infrastructure changes."""
     try:
-        gh = GitHubClient()
+        # Existing declarations are flagged for the reviewer; CI's terraform validate is the gate
+        collisions, equivalents = await _check_declarations(params.files)
         
-        # Create branch
-        gh.create_branch(params.branch_name)
-        
-        # Create/update files
-        for filepath, content in params.files.items():
-            gh.create_file(
-                path=filepath,
-                content=content,
-                message=f"Add {filepath}",
+        async with AsyncGitHubClient() as gh:
+            # Create the branch with every file in one commit
+            await gh.commit_files(
+                files=params.files,
+                message=params.title,
                 branch=params.branch_name
             )
-        
-        # Create PR
-        result = gh.create_pull_request(
-            title=params.title,
-            body=params.description,
-            head_branch=params.branch_name
-        )
+            
+            # Create PR
+            result = await gh.create_pull_request(
+                title=params.title,
+                body=params.description,
+                head_branch=params.branch_name
+            )
         
         return f"""## Pull Request Created!
 
@@ -492,7 +1147,7 @@ The CI/CD pipeline will automatically:
 4. Run security scans
 
 Once approved and merged, changes will be applied to dev, then prod.
-"""
+""" + _existing_declarations_note(collisions, equivalents)
     except Exception as e:
         return _format_error(e)
 
@@ -500,8 +1155,9 @@ Once approved and merged, changes will be applied to dev, then prod.
 async def list_open_prs() -> str:
     """List open Pull Requests in the infrastructure repository."""
     try:
-        gh = GitHubClient()
-        prs = gh.list_pull_requests(state="open")
+        # Unchanged pages come back as free 304s, so there is no need for a TTL here
+        async with AsyncGitHubClient() as gh:
+            prs = await gh.list_pull_requests(state="open")
         
         if not prs:
             return "No open Pull Requests."
@@ -513,6 +1169,7 @@ async def list_open_prs() -> str:
             lines.append(f"- **Created:** {pr['created_at']}")
             lines.append(f"- **URL:** {pr['url']}")
             lines.append("")
+        lines.append(rate_limit_note())
         
         return "\n".join(lines)
     except Exception as e:
@@ -522,8 +1179,8 @@ async def list_open_prs() -> str:
 async def list_pipeline_runs(limit: int = 5) -> str:
     """List recent CI/CD pipeline runs."""
     try:
-        gh = GitHubClient()
-        runs = gh.list_workflow_runs(limit=limit)
+        async with AsyncGitHubClient() as gh:
+            runs = await gh.list_workflow_runs(limit=limit)
         
         if not runs:
             return "No recent workflow runs."
@@ -534,6 +1191,7 @@ async def list_pipeline_runs(limit: int = 5) -> str:
             lines.append(f"- {status_emoji} **{run['name']}** on {run['branch']}")
             lines.append(f"  - Status: {run['status']} | Conclusion: {run['conclusion'] or 'in progress'}")
             lines.append(f"  - [View Run]({run['url']})")
+        lines.append(f"\n{rate_limit_note()}")
         
         return "\n".join(lines)
     except Exception as e:
@@ -550,90 +1208,8 @@ async def terraform_generate_ec2_free_tier(
 ) -> str:
     """Generate Terraform configuration for a free-tier EC2 instance."""
     try:
-        config = f'''# =============================================================================
-# EC2 Instance - Free Tier Eligible
-# =============================================================================
-
-# Get the latest Amazon Linux 2 AMI (free tier eligible)
-data "aws_ami" "amazon_linux_2" {{
-  most_recent = true
-  owners      = ["amazon"]
-
-  filter {{
-    name   = "name"
-    values = ["amzn2-ami-hvm-*-x86_64-gp2"]
-  }}
-
-  filter {{
-    name   = "virtualization-type"
-    values = ["hvm"]
-  }}
-}}
-
-# Security Group for the EC2 instance
-resource "aws_security_group" "{instance_name.replace("-", "_")}_sg" {{
-  name        = "{instance_name}-sg"
-  description = "Security group for {instance_name}"
-  vpc_id      = module.vpc.vpc_id
-
-  # SSH access (restrict to your IP in production!)
-  ingress {{
-    from_port   = 22
-    to_port     = 22
-    protocol    = "tcp"
-    cidr_blocks = ["0.0.0.0/0"]  # TODO: Restrict to your IP
-    description = "SSH access"
-  }}
-
-  # Outbound internet access
-  egress {{
-    from_port   = 0
-    to_port     = 0
-    protocol    = "-1"
-    cidr_blocks = ["0.0.0.0/0"]
-  }}
-
-  tags = {{
-    Name        = "{instance_name}-sg"
-    Environment = "{environment}"
-    ManagedBy   = "terraform"
-  }}
-}}
-
-# EC2 Instance - t2.micro is free tier eligible
-resource "aws_instance" "{instance_name.replace("-", "_")}" {{
-  ami                    = data.aws_ami.amazon_linux_2.id
-  instance_type          = "t2.micro"  # Free tier eligible!
-  subnet_id              = module.vpc.public_subnets[0]
-  vpc_security_group_ids = [aws_security_group.{instance_name.replace("-", "_")}_sg.id]
-  
-  # Enable if you need SSH access
-  # key_name = "your-key-pair-name"
-
-  root_block_device {{
-    volume_size = 8    # GB - Free tier includes 30GB total
-    volume_type = "gp2"
-    encrypted   = true
-  }}
-
-  tags = {{
-    Name        = "{instance_name}"
-    Environment = "{environment}"
-    ManagedBy   = "terraform"
-  }}
-}}
-
-# Outputs
-output "{instance_name.replace("-", "_")}_public_ip" {{
-  value       = aws_instance.{instance_name.replace("-", "_")}.public_ip
-  description = "Public IP of {instance_name}"
-}}
-
-output "{instance_name.replace("-", "_")}_instance_id" {{
-  value       = aws_instance.{instance_name.replace("-", "_")}.id
-  description = "Instance ID of {instance_name}"
-}}
-'''
+        config = hcl_render.ec2_free_tier(instance_name, environment)
+        collisions, equivalents = await _check_declarations({f"{instance_name}.tf": config})
         return f"""## EC2 Free Tier Terraform Configuration
 
 **Instance Name:** {instance_name}
@@ -654,7 +1230,7 @@ output "{instance_name.replace("-", "_")}_instance_id" {{
 1. Review the security group settings
 2. Add your SSH key pair if needed
 3. Create a PR for approval
-"""
+""" + _existing_declarations_note(collisions, equivalents)
     except Exception as e:
         return f"Error: {str(e)}"
 
@@ -667,58 +1243,8 @@ async def terraform_generate_iam_user_with_okta(
 ) -> str:
     """Generate Terraform for AWS IAM user with Okta group mapping."""
     try:
-        config = f'''# =============================================================================
-# IAM User with Okta Group Mapping
-# =============================================================================
-
-# IAM Group (maps to Okta group: {okta_group_name})
-resource "aws_iam_group" "{group_name.replace("-", "_")}" {{
-  name = "{group_name}"
-  path = "/users/"
-}}
-
-# IAM Group Policy - Developer Access
-resource "aws_iam_group_policy_attachment" "{group_name.replace("-", "_")}_policy" {{
-  group      = aws_iam_group.{group_name.replace("-", "_")}.name
-  policy_arn = "arn:aws:iam::aws:policy/PowerUserAccess"
-}}
-
-# IAM User
-resource "aws_iam_user" "{username.replace("-", "_").replace(".", "_")}" {{
-  name = "{username}"
-  path = "/users/"
-  
-  tags = {{
-    OktaGroup   = "{okta_group_name}"
-    ManagedBy   = "terraform"
-    Description = "User synced from Okta"
-  }}
-}}
-
-# Add user to group
-resource "aws_iam_user_group_membership" "{username.replace("-", "_").replace(".", "_")}_membership" {{
-  user   = aws_iam_user.{username.replace("-", "_").replace(".", "_")}.name
-  groups = [aws_iam_group.{group_name.replace("-", "_")}.name]
-}}
-
-# =============================================================================
-# Okta Group (for SAML federation)
-# =============================================================================
-
-resource "okta_group" "{okta_group_name.replace("-", "_")}" {{
-  name        = "{okta_group_name}"
-  description = "Maps to AWS IAM group: {group_name}"
-}}
-
-# Okta Group Rule - Auto-assign users based on department
-resource "okta_group_rule" "{okta_group_name.replace("-", "_")}_rule" {{
-  name              = "{okta_group_name}-auto-assign"
-  status            = "ACTIVE"
-  group_assignments = [okta_group.{okta_group_name.replace("-", "_")}.id]
-  expression_type   = "urn:okta:expression:1.0"
-  expression_value  = "user.department==\\"Engineering\\""
-}}
-'''
+        config = hcl_render.iam_user_with_okta(username, group_name, okta_group_name)
+        collisions, equivalents = await _check_declarations({f"{username}.tf": config})
         return f"""## IAM User with Okta Mapping Configuration
 
 ### Summary:
@@ -749,7 +1275,7 @@ AWS IAM User ({username})
 1. Create PR for review
 2. Configure SAML provider in AWS (one-time setup)
 3. Apply after approval
-"""
+""" + _existing_declarations_note(collisions, equivalents)
     except Exception as e:
         return f"Error: {str(e)}"
 
@@ -779,25 +1305,27 @@ async def complete_infrastructure_workflow(
         # Step 2: Create GitHub PR
         results.append("## Step 2: GitHub Pull Request")
         try:
-            gh = GitHubClient()
             branch_name = f"infra/{change_description.lower().replace(' ', '-')[:30]}-{datetime.now().strftime('%Y%m%d%H%M')}"
             
-            # Create branch
-            gh.create_branch(branch_name)
-            
-            # Create file
             file_path = f"terraform/changes/{branch_name.split('/')[-1]}.tf"
-            gh.create_file(
-                path=file_path,
-                content=terraform_config,
-                message=f"Add infrastructure: {change_description}",
-                branch=branch_name
-            )
+            collisions, equivalents = await _check_declarations({file_path: terraform_config})
+            for line in collisions:
+                results.append(f"⚠️ Already declared: {line[2:]}")
+            for line in equivalents:
+                results.append(f"⚠️ Possible duplicate {line[2:]}")
             
-            # Create PR
-            pr_result = gh.create_pull_request(
-                title=f"🏗️ Infrastructure: {change_description}",
-                body=f"""## Infrastructure Change Request
+            async with AsyncGitHubClient() as gh:
+                # Create branch and file in one commit
+                await gh.commit_files(
+                    files={file_path: terraform_config},
+                    message=f"Add infrastructure: {change_description}",
+                    branch=branch_name
+                )
+                
+                # Create PR
+                pr_result = await gh.create_pull_request(
+                    title=f"🏗️ Infrastructure: {change_description}",
+                    body=f"""## Infrastructure Change Request
 
 **Description:** {change_description}
 
@@ -817,8 +1345,8 @@ async def complete_infrastructure_workflow(
 ---
 *This PR was automatically generated by the Infrastructure Automation MCP*
 """,
-                head_branch=branch_name
-            )
+                    head_branch=branch_name
+                )
             
             results.append(f"✅ **PR Created:** [{pr_result['title']}]({pr_result['url']})")
             results.append(f"   - PR Number: #{pr_result['pr_number']}")
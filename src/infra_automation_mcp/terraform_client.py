@@ -1,12 +1,35 @@
 """Terraform Operations Client - Generate, Plan, and Apply Infrastructure"""
 
 import os
+import re
 import json
-import subprocess
+import shutil
+import asyncio
+import hashlib
 import tempfile
-from typing import Optional
+from collections import deque
+from datetime import datetime
+from typing import Awaitable, Callable, Iterable, Optional
 from pathlib import Path
 
+from infra_automation_mcp import hcl_render
+from infra_automation_mcp.terraform_index import scan_block
+from infra_automation_mcp.terraform_plan import PlanSummary, parse_plan_file
+
+# Callback receiving each output line as it is produced, e.g. to forward progress
+OutputCallback = Callable[[str], Awaitable[None]]
+
+# Blocks that decide what `terraform init` sets up: terraform {} (backend, required
+# providers) and module calls. Resources, data sources etc. can change without re-running init.
+_INIT_BLOCK = re.compile(r'^(terraform|module\s+"[^"]+")\s*\{', re.MULTILINE)
+_MODULE_SOURCE = re.compile(r'\b(?:source|version)\s*=\s*"[^"]*"')
+
+# provider "registry.terraform.io/hashicorp/aws" { version = "5.31.0" ... } in .terraform.lock.hcl
+_LOCKED_PROVIDER = re.compile(r'^provider\s+"([^"]+)"\s*\{\s*version\s*=\s*"([^"]+)"', re.MULTILINE)
+
+# Written into .terraform/ after a successful init
+_INIT_MARKER = ".init-fingerprint"
+
 
 class TerraformError(Exception):
     def __init__(self, message: str, output: str = None):
@@ -16,164 +39,184 @@ class TerraformError(Exception):
 
 
 class TerraformClient:
-    """Client for Terraform operations - generates configs and runs commands."""
+    """Client for Terraform operations - generates configs and runs commands.
+
+    Commands run as asyncio subprocesses. Their output is streamed line by line
+    into a bounded in-memory tail (TERRAFORM_OUTPUT_LINES per stream) and a full
+    log file under `.terraform-logs/`, so long applies neither block the event
+    loop nor hold their whole output in memory.
+
+    Provider plugins and downloaded modules are shared across working dirs via
+    TERRAFORM_CACHE_DIR, and `init` is skipped when nothing it depends on changed.
+    """
     
     def __init__(self, working_dir: str = None):
         self.working_dir = working_dir or os.getenv("TERRAFORM_WORKING_DIR", tempfile.mkdtemp())
         Path(self.working_dir).mkdir(parents=True, exist_ok=True)
+        self.max_output_lines = int(os.getenv("TERRAFORM_OUTPUT_LINES", "200"))
+        self.last_log_path: Optional[str] = None
+        self.cache_dir = Path(os.path.expanduser(
+            os.getenv("TERRAFORM_CACHE_DIR", "~/.cache/infra-automation-mcp/terraform")))
     
-    def _run_command(self, args: list, capture_output: bool = True) -> tuple[int, str, str]:
-        """Run a terraform command and return (returncode, stdout, stderr)."""
+    def _command_env(self) -> dict:
+        env = dict(os.environ, TF_IN_AUTOMATION="1")
+        if "TF_PLUGIN_CACHE_DIR" not in env:
+            plugin_cache = self.cache_dir / "plugin-cache"
+            plugin_cache.mkdir(parents=True, exist_ok=True)
+            env["TF_PLUGIN_CACHE_DIR"] = str(plugin_cache)
+        return env
+
+    def plugin_cache_ready(self) -> bool:
+        """True when every provider in the lock file is already in the plugin cache.
+
+        Init then only links from the cache and can run alongside other inits;
+        otherwise it downloads into the cache, which is not safe for concurrent writers.
+        """
+        lock_file = Path(self.working_dir) / ".terraform.lock.hcl"
+        if not lock_file.exists():
+            return False
+        plugin_cache = Path(self._command_env()["TF_PLUGIN_CACHE_DIR"])
+        providers = _LOCKED_PROVIDER.findall(lock_file.read_text(errors="replace"))
+        return all(any((plugin_cache / source / version).glob("*")) for source, version in providers)
+
+    def _init_blocks(self) -> Iterable[tuple[str, str]]:
+        """(header, body) of every terraform {} and module block, comments and whitespace normalised."""
+        for tf_file in sorted(Path(self.working_dir).glob("*.tf")):
+            text = tf_file.read_text(errors="replace")
+            for m in _INIT_BLOCK.finditer(text):
+                yield " ".join(m.group(1).split()), scan_block(text, m.end())[1]
+
+    def _dependency_fingerprint(self) -> str:
+        """Hash of everything `terraform init` depends on: the full terraform {} blocks
+        (backend settings, required_providers in any form), module blocks and the lock file."""
+        digest = hashlib.sha256()
+        for header, body in self._init_blocks():
+            digest.update(f"{header} {{{body}}}\n".encode())
+        lock_file = Path(self.working_dir) / ".terraform.lock.hcl"
+        if lock_file.exists():
+            digest.update(lock_file.read_bytes())
+        return digest.hexdigest()
+
+    def _module_sources_key(self) -> str:
+        """Cache key for downloaded modules: each module call's source and version only."""
+        digest = hashlib.sha256()
+        for header, body in self._init_blocks():
+            if header.startswith("module"):
+                digest.update(f"{header} {' '.join(_MODULE_SOURCE.findall(body))}\n".encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def _store_modules(source: Path, target: Path) -> None:
+        # Copy then rename so concurrent inits never see a half-written cache entry
+        staging = Path(tempfile.mkdtemp(dir=target.parent))
+        try:
+            shutil.copytree(source, staging / "modules", symlinks=True)
+            os.replace(staging / "modules", target)
+        except OSError:
+            pass  # another init stored the same modules first
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def _new_log_path(self, command: str) -> Path:
+        log_dir = Path(self.working_dir) / ".terraform-logs"
+        log_dir.mkdir(exist_ok=True)
+        return log_dir / f"{command}-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.log"
+
+    def _format_tail(self, tail: deque, total: int, log_path: Path) -> str:
+        text = "\n".join(tail)
+        if total > len(tail):
+            text = f"... [{total - len(tail)} earlier lines omitted; full log: {log_path}]\n" + text
+        return text + "\n" if tail else ""
+
+    async def _run_command(self, args: list, on_output: OutputCallback = None,
+                           timeout: float = 300, keep_all_output: bool = False) -> tuple[int, str, str]:
+        """Run a terraform command and return (returncode, stdout tail, stderr tail)."""
+        log_path = self._new_log_path(args[0])
+        self.last_log_path = str(log_path)
         try:
-            result = subprocess.run(
-                ["terraform"] + args,
+            proc = await asyncio.create_subprocess_exec(
+                "terraform", *args,
                 cwd=self.working_dir,
-                capture_output=capture_output,
-                text=True,
-                timeout=300  # 5 minute timeout
+                env=self._command_env(),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                limit=1024 * 1024
             )
-            return result.returncode, result.stdout, result.stderr
         except FileNotFoundError:
             raise TerraformError("Terraform CLI not found. Please install Terraform.")
-        except subprocess.TimeoutExpired:
-            raise TerraformError("Terraform command timed out")
+
+        max_lines = None if keep_all_output else self.max_output_lines
+        tails = {"stdout": deque(maxlen=max_lines), "stderr": deque(maxlen=max_lines)}
+        totals = {"stdout": 0, "stderr": 0}
+
+        with open(log_path, "w") as log:
+            async def pump(stream: asyncio.StreamReader, name: str):
+                async for raw in stream:
+                    line = raw.decode(errors="replace").rstrip("\r\n")
+                    tails[name].append(line)
+                    totals[name] += 1
+                    log.write(line + "\n")
+                    if on_output:
+                        await on_output(line)
+
+            pumps = [asyncio.ensure_future(pump(proc.stdout, "stdout")),
+                     asyncio.ensure_future(pump(proc.stderr, "stderr"))]
+            try:
+                await asyncio.wait_for(asyncio.gather(*pumps, proc.wait()), timeout=timeout)
+            except asyncio.TimeoutError:
+                raise TerraformError(
+                    f"Terraform command timed out after {timeout}s",
+                    output=self._format_tail(tails["stdout"], totals["stdout"], log_path)
+                )
+            except (ValueError, asyncio.LimitOverrunError) as e:
+                # A single output line longer than the stream limit
+                raise TerraformError(
+                    f"terraform {args[0]} output could not be read ({e}); full log: {log_path}",
+                    output=self._format_tail(tails["stdout"], totals["stdout"], log_path)
+                )
+            except Exception as e:
+                if not on_output:
+                    raise
+                raise TerraformError(
+                    f"Output callback failed during terraform {args[0]}: {e}; full log: {log_path}",
+                    output=self._format_tail(tails["stdout"], totals["stdout"], log_path)
+                )
+            finally:
+                # Covers timeouts, errors and cancellation of the calling tool
+                for task in pumps:
+                    task.cancel()
+                if proc.returncode is None:
+                    proc.kill()
+                    await proc.wait()
+
+        return (
+            proc.returncode,
+            self._format_tail(tails["stdout"], totals["stdout"], log_path),
+            self._format_tail(tails["stderr"], totals["stderr"], log_path)
+        )
 
     def generate_okta_user_config(self, email: str, first_name: str, last_name: str,
                                    department: str = None, groups: list = None) -> str:
         """Generate Terraform config for an Okta user."""
-        resource_name = email.replace("@", "_").replace(".", "_")
-        
-        config = f'''
-# Okta User: {first_name} {last_name}
-resource "okta_user" "{resource_name}" {{
-  first_name = "{first_name}"
-  last_name  = "{last_name}"
-  email      = "{email}"
-  login      = "{email}"
-'''
-        if department:
-            config += f'  department = "{department}"\n'
-        config += "}\n"
-        
-        # Add group memberships
-        if groups:
-            for group in groups:
-                group_resource = group.lower().replace("-", "_").replace(" ", "_")
-                config += f'''
-resource "okta_group_membership" "{resource_name}_{group_resource}" {{
-  group_id = okta_group.{group_resource}.id
-  user_id  = okta_user.{resource_name}.id
-}}
-'''
-        return config
+        return hcl_render.okta_user(email, first_name, last_name, department=department, groups=groups)
 
     def generate_okta_group_config(self, name: str, description: str = None) -> str:
         """Generate Terraform config for an Okta group."""
-        resource_name = name.lower().replace("-", "_").replace(" ", "_")
-        return f'''
-# Okta Group: {name}
-resource "okta_group" "{resource_name}" {{
-  name        = "{name}"
-  description = "{description or name}"
-}}
-'''
+        return hcl_render.okta_group(name, description)
 
     def generate_eks_cluster_config(self, cluster_name: str, environment: str,
                                      node_count: int = 2, instance_type: str = "t3.medium") -> str:
         """Generate Terraform config for an EKS cluster."""
-        return f'''
-# EKS Cluster: {cluster_name}
-module "eks_{cluster_name.replace("-", "_")}" {{
-  source  = "terraform-aws-modules/eks/aws"
-  version = "~> 19.0"
-
-  cluster_name    = "{cluster_name}"
-  cluster_version = "1.28"
-
-  vpc_id     = module.vpc.vpc_id
-  subnet_ids = module.vpc.private_subnets
-
-  eks_managed_node_groups = {{
-    general = {{
-      name           = "general-{environment}"
-      instance_types = ["{instance_type}"]
-      min_size       = 1
-      max_size       = {node_count * 2}
-      desired_size   = {node_count}
-
-      labels = {{
-        Environment = "{environment}"
-      }}
-    }}
-  }}
-
-  tags = {{
-    Environment = "{environment}"
-    ManagedBy   = "terraform"
-    Cluster     = "{cluster_name}"
-  }}
-}}
-
-output "{cluster_name.replace("-", "_")}_endpoint" {{
-  value = module.eks_{cluster_name.replace("-", "_")}.cluster_endpoint
-}}
-'''
+        return hcl_render.eks_cluster(cluster_name, environment, node_count, instance_type)
 
     def generate_vpc_config(self, name: str, cidr: str = "10.0.0.0/16", azs: int = 2) -> str:
         """Generate Terraform config for a VPC."""
-        private_subnets = ", ".join([f'"10.0.{i+1}.0/24"' for i in range(azs)])
-        public_subnets = ", ".join([f'"10.0.{i+101}.0/24"' for i in range(azs)])
-        az_list = ", ".join([f'"us-east-1{chr(97+i)}"' for i in range(azs)])
-        
-        return f'''
-# VPC: {name}
-module "vpc" {{
-  source  = "terraform-aws-modules/vpc/aws"
-  version = "~> 5.0"
-
-  name = "{name}"
-  cidr = "{cidr}"
-
-  azs             = [{az_list}]
-  private_subnets = [{private_subnets}]
-  public_subnets  = [{public_subnets}]
-
-  enable_nat_gateway   = true
-  single_nat_gateway   = true
-  enable_dns_hostnames = true
-
-  tags = {{
-    ManagedBy = "terraform"
-  }}
-}}
-'''
+        return hcl_render.vpc(name, cidr, azs)
 
     def generate_iam_role_config(self, role_name: str, policy_arn: str, 
                                   trust_principal: str = "ec2.amazonaws.com") -> str:
         """Generate Terraform config for an IAM role."""
-        resource_name = role_name.lower().replace("-", "_")
-        return f'''
-# IAM Role: {role_name}
-resource "aws_iam_role" "{resource_name}" {{
-  name = "{role_name}"
-
-  assume_role_policy = jsonencode({{
-    Version = "2012-10-17"
-    Statement = [{{
-      Action = "sts:AssumeRole"
-      Effect = "Allow"
-      Principal = {{
-        Service = "{trust_principal}"
-      }}
-    }}]
-  }})
-}}
-
-resource "aws_iam_role_policy_attachment" "{resource_name}_policy" {{
-  role       = aws_iam_role.{resource_name}.name
-  policy_arn = "{policy_arn}"
-}}
-'''
+        return hcl_render.iam_role(role_name, policy_arn, trust_principal)
 
     def write_config(self, filename: str, content: str) -> str:
         """Write Terraform config to a file."""
@@ -182,36 +225,141 @@ resource "aws_iam_role_policy_attachment" "{resource_name}_policy" {{
             f.write(content)
         return filepath
 
-    def init(self) -> tuple[bool, str]:
-        """Run terraform init."""
-        code, stdout, stderr = self._run_command(["init", "-no-color"])
+    def write_blocks(self, filename: str, blocks: Iterable[str]) -> tuple[str, int]:
+        """Stream rendered blocks (e.g. from hcl_render.render_okta_users) into one file.
+
+        Returns (path, block count). Blocks go to a temporary file that is only
+        renamed into place once all of them are written, so a render error
+        never leaves a partial or empty .tf file behind.
+        """
+        filepath = os.path.join(self.working_dir, filename)
+        partial = f"{filepath}.partial"
+        count = 0
+        try:
+            with open(partial, "w") as f:
+                for block in blocks:
+                    if count:
+                        f.write("\n")
+                    f.write(block)
+                    count += 1
+            os.replace(partial, filepath)
+        except BaseException:
+            Path(partial).unlink(missing_ok=True)
+            raise
+        return filepath, count
+
+    async def init(self, on_output: OutputCallback = None, force: bool = False) -> tuple[bool, str]:
+        """Run terraform init, unless the lock file and module sources are unchanged since the last one."""
+        dot_terraform = Path(self.working_dir) / ".terraform"
+        marker = dot_terraform / _INIT_MARKER
+        if not force and marker.exists() and marker.read_text() == self._dependency_fingerprint():
+            return True, "Terraform init skipped: providers, modules and lock file unchanged since last init.\n"
+
+        args = ["init", "-no-color", "-input=false"]
+        local_modules = dot_terraform / "modules"
+        cached_modules = self.cache_dir / "modules" / self._module_sources_key()
+        cached_modules.parent.mkdir(parents=True, exist_ok=True)
+        if cached_modules.exists() and not local_modules.exists():
+            await asyncio.to_thread(shutil.copytree, cached_modules, local_modules, symlinks=True)
+            args.append("-get=false")
+
+        code, stdout, stderr = await self._run_command(args, on_output)
         output = stdout + stderr
+        if code == 0:
+            dot_terraform.mkdir(exist_ok=True)
+            marker.write_text(self._dependency_fingerprint())
+            if local_modules.exists() and not cached_modules.exists():
+                await asyncio.to_thread(self._store_modules, local_modules, cached_modules)
         return code == 0, output
 
-    def plan(self, out_file: str = "tfplan") -> tuple[bool, str]:
+    async def plan(self, out_file: str = "tfplan", on_output: OutputCallback = None,
+                   timeout: float = 300) -> tuple[bool, str]:
         """Run terraform plan."""
-        code, stdout, stderr = self._run_command(["plan", "-no-color", f"-out={out_file}"])
+        code, stdout, stderr = await self._run_command(
+            ["plan", "-no-color", "-input=false", f"-out={out_file}"], on_output, timeout=timeout)
         output = stdout + stderr
         return code == 0, output
 
-    def apply(self, auto_approve: bool = False) -> tuple[bool, str]:
+    async def _run_to_file(self, args: list, suffix: str, timeout: float = 300) -> Path:
+        """Run a terraform command with stdout written straight to a file under .terraform-logs/.
+
+        Used for JSON documents (plans, state) that can run to megabytes on a
+        single line and would not fit the line-based output capture.
+        """
+        out_path = self._new_log_path(args[0]).with_suffix(suffix)
+        self.last_log_path = str(out_path)
+        try:
+            with open(out_path, "wb") as out:
+                try:
+                    proc = await asyncio.create_subprocess_exec(
+                        "terraform", *args,
+                        cwd=self.working_dir,
+                        env=self._command_env(),
+                        stdout=out,
+                        stderr=asyncio.subprocess.PIPE
+                    )
+                except FileNotFoundError:
+                    raise TerraformError("Terraform CLI not found. Please install Terraform.")
+                try:
+                    _, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    raise TerraformError(f"Terraform command timed out after {timeout}s")
+                finally:
+                    if proc.returncode is None:
+                        proc.kill()
+                        await proc.wait()
+
+            if proc.returncode != 0:
+                raise TerraformError(f"terraform {' '.join(args)} failed", output=stderr.decode(errors="replace"))
+        except BaseException:
+            # A partial document is no use to anyone and may hold secrets
+            out_path.unlink(missing_ok=True)
+            raise
+        return out_path
+
+    async def show_plan_json(self, plan_file: str = "tfplan") -> Path:
+        """Write `terraform show -json` for a saved plan to a file and return its path."""
+        return await self._run_to_file(["show", "-json", plan_file], ".json")
+
+    async def show_state_json(self) -> Path:
+        """Write `terraform show -json` for the current state to a file and return its path."""
+        return await self._run_to_file(["show", "-json"], ".json")
+
+    async def pull_state(self) -> Path:
+        """Write the raw state from the configured backend to a file and return its path."""
+        return await self._run_to_file(["state", "pull"], ".tfstate")
+
+    async def plan_summary(self, plan_file: str = "tfplan") -> PlanSummary:
+        """Typed summary of a saved plan: counts per action, changed addresses, forced replacements."""
+        log_path = self.last_log_path
+        json_path = await self.show_plan_json(plan_file)
+        try:
+            return await asyncio.to_thread(parse_plan_file, str(json_path))
+        finally:
+            # The JSON plan carries prior state and planned values, secrets included
+            json_path.unlink(missing_ok=True)
+            self.last_log_path = log_path
+
+    async def apply(self, auto_approve: bool = False, on_output: OutputCallback = None,
+                    timeout: float = 1800) -> tuple[bool, str]:
         """Run terraform apply."""
-        args = ["apply", "-no-color"]
+        args = ["apply", "-no-color", "-input=false"]
         if auto_approve:
             args.append("-auto-approve")
-        code, stdout, stderr = self._run_command(args)
+        code, stdout, stderr = await self._run_command(args, on_output, timeout=timeout)
         output = stdout + stderr
         return code == 0, output
 
-    def show_state(self) -> tuple[bool, str]:
+    async def show_state(self) -> tuple[bool, str]:
         """Run terraform show to display current state."""
-        code, stdout, stderr = self._run_command(["show", "-no-color"])
+        code, stdout, stderr = await self._run_command(["show", "-no-color"])
         output = stdout + stderr
         return code == 0, output
 
-    def output(self) -> tuple[bool, dict]:
+    async def output(self) -> tuple[bool, dict]:
         """Get terraform outputs as JSON."""
-        code, stdout, stderr = self._run_command(["output", "-json"])
+        # Outputs are parsed whole, so keep every line rather than the tail
+        code, stdout, stderr = await self._run_command(["output", "-json"], keep_all_output=True)
         if code == 0:
             try:
                 return True, json.loads(stdout)
@@ -219,12 +367,12 @@ resource "aws_iam_role_policy_attachment" "{resource_name}_policy" {{
                 return False, {}
         return False, {}
 
-    def fmt(self) -> tuple[bool, str]:
+    async def fmt(self) -> tuple[bool, str]:
         """Run terraform fmt to format files."""
-        code, stdout, stderr = self._run_command(["fmt", "-recursive"])
+        code, stdout, stderr = await self._run_command(["fmt", "-recursive"])
         return code == 0, stdout + stderr
 
-    def validate(self) -> tuple[bool, str]:
+    async def validate(self) -> tuple[bool, str]:
         """Run terraform validate."""
-        code, stdout, stderr = self._run_command(["validate", "-no-color"])
-        return code == 0, stdout + stderr
\ No newline at end of file
+        code, stdout, stderr = await self._run_command(["validate", "-no-color"])
+        return code == 0, stdout + stderr
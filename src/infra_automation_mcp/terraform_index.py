@@ -0,0 +1,243 @@
+"""Terraform Declaration Index - every resource, module and output address under terraform/"""
+
+import hashlib
+import os
+import re
+import threading
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+_BLOCK_HEADER = re.compile(
+    r'^(resource|data)\s+"([^"]+)"\s+"([^"]+)"\s*\{|^(module|output|variable)\s+"([^"]+)"\s*\{',
+    re.MULTILINE
+)
+_SPECIAL = re.compile(r'["#{}/<]')
+_HEREDOC = re.compile(r"<<-?([A-Za-z_]\w*)\n")
+# String literals and brackets, plus a `name = "..."` argument with its value in group 1
+_NAME_TOKENS = re.compile(r'"(?:[^"\\]|\\.)*"|[{}\[\]()]|(?<![\w.-])name\s*=\s*("(?:[^"\\]|\\.)*")')
+
+# Kinds where an identical body under another name means the same infrastructure twice
+EQUIVALENT_KINDS = ("resource", "module")
+
+
+class Declaration(NamedTuple):
+    kind: str
+    address: str
+    file: str
+    line: int
+    fingerprint: str
+
+    @property
+    def directory(self) -> str:
+        return os.path.dirname(self.file)
+
+
+def scan_block(text: str, i: int) -> tuple[int, str]:
+    """Scan from just after a block's opening brace to its close.
+
+    Returns (end offset, body with comments dropped and whitespace collapsed).
+    """
+    depth, out, n = 1, [], len(text)
+    while i < n:
+        m = _SPECIAL.search(text, i)
+        if m is None:
+            break
+        out.append(text[i:m.start()])
+        i, char = m.start(), m.group()
+        if char == '"':
+            j = i + 1
+            while j < n and text[j] != '"':
+                j += 2 if text[j] == "\\" else 1
+            out.append(text[i:j + 1])
+            i = j + 1
+        elif char == "#" or text.startswith("//", i):
+            j = text.find("\n", i)
+            i = n if j < 0 else j
+        elif text.startswith("/*", i):
+            j = text.find("*/", i + 2)
+            i = n if j < 0 else j + 2
+        elif char == "<" and _HEREDOC.match(text, i):
+            heredoc = _HEREDOC.match(text, i)
+            end = re.compile(rf"^\s*{heredoc.group(1)}\s*$", re.MULTILINE).search(text, heredoc.end())
+            stop = end.end() if end else n
+            out.append(text[i:stop])
+            i = stop
+        else:
+            if char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+                if depth == 0:
+                    return i + 1, " ".join("".join(out).split())
+            out.append(char)
+            i += 1
+    return n, " ".join("".join(out).split())
+
+
+def _name_argument(body: str) -> Optional[tuple]:
+    """Span of the block's own top-level `name = "..."` value, if it has one."""
+    depth = 0
+    for m in _NAME_TOKENS.finditer(body):
+        token = m.group()
+        if m.group(1) is not None:
+            if depth == 0:
+                return m.span(1)
+        elif token in "{[(":
+            depth += 1
+        elif token in "}])":
+            depth -= 1
+    return None
+
+
+def _mask_own_name(body: str, label: str) -> str:
+    # Blank out the block's own name however it is spelled: the label itself, names
+    # built from it (aws_security_group.x_sg.id) and its string forms ("x-sg",
+    # "Security group for x"). References to other blocks are left alone, so two
+    # attachments pointing at different groups still fingerprint differently, and
+    # so is a top-level `name` argument: that is the object's identity in the
+    # provider, and two groups that differ only by name are not duplicates.
+    spelled = r"[\W_]".join(re.escape(part) for part in label.split("_"))
+    pattern = re.compile(rf"(?<![A-Za-z0-9]){spelled}(?![A-Za-z0-9])", re.IGNORECASE)
+    span = _name_argument(body)
+    if span is None:
+        return pattern.sub("<name>", body)
+    start, end = span
+    return pattern.sub("<name>", body[:start]) + body[start:end] + pattern.sub("<name>", body[end:])
+
+
+def parse_declarations(text: str, file: str) -> list:
+    """Top-level resource, data, module, output and variable blocks in one .tf file."""
+    blocks = []
+    pos = 0
+    while True:
+        m = _BLOCK_HEADER.search(text, pos)
+        if m is None:
+            break
+        end, body = scan_block(text, m.end())
+        if m.group(1):
+            kind, block_type, label = m.group(1), m.group(2), m.group(3)
+            address = f"{block_type}.{label}" if kind == "resource" else f"data.{block_type}.{label}"
+        else:
+            kind, block_type, label = m.group(4), m.group(4), m.group(5)
+            address = f"{'var' if kind == 'variable' else kind}.{label}"
+        blocks.append((kind, block_type, label, address, text.count("\n", 0, m.start()) + 1, body))
+        pos = end
+
+    return [
+        Declaration(kind, address, file, line,
+                    hashlib.sha256(f"{kind} {block_type} {_mask_own_name(body, label)}".encode()).hexdigest()[:16])
+        for kind, block_type, label, address, line, body in blocks
+    ]
+
+
+class _FileEntry(NamedTuple):
+    mtime_ns: int
+    size: int
+    digest: str
+    declarations: list
+
+
+class ResourceIndex:
+    """Address index over every .tf file under the Terraform tree, refreshed incrementally.
+
+    `refresh` only re-reads files whose mtime or size moved, and only re-parses
+    those whose content hash actually changed, so calling it before every
+    lookup costs one stat per file.
+    """
+
+    def __init__(self, base: str = None):
+        self.base = Path(base or os.getenv("TERRAFORM_WORKING_DIR", "terraform"))
+        self._files: dict[str, _FileEntry] = {}
+        self._by_address: dict[tuple, list] = {}
+        self._by_name: dict[str, list] = {}
+        self._by_fingerprint: dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def refresh(self) -> dict:
+        """Pick up added, changed and deleted files. Returns counts of what was done."""
+        with self._lock:
+            seen, parsed, rehashed = set(), 0, 0
+            for dirpath, dirnames, filenames in os.walk(self.base):
+                dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+                for filename in filenames:
+                    if not filename.endswith(".tf"):
+                        continue
+                    path = os.path.join(dirpath, filename)
+                    rel = os.path.relpath(path, self.base)
+                    seen.add(rel)
+                    stat = os.stat(path)
+                    entry = self._files.get(rel)
+                    if entry and (entry.mtime_ns, entry.size) == (stat.st_mtime_ns, stat.st_size):
+                        continue
+                    with open(path, "rb") as f:
+                        content = f.read()
+                    digest = hashlib.sha256(content).hexdigest()
+                    rehashed += 1
+                    if entry and entry.digest == digest:
+                        self._files[rel] = entry._replace(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                        continue
+                    declarations = parse_declarations(content.decode("utf-8", errors="replace"), rel)
+                    self._files[rel] = _FileEntry(stat.st_mtime_ns, stat.st_size, digest, declarations)
+                    parsed += 1
+
+            removed = [rel for rel in self._files if rel not in seen]
+            for rel in removed:
+                del self._files[rel]
+            if parsed or removed:
+                self._rebuild()
+            return {"files": len(self._files), "rehashed": rehashed, "parsed": parsed, "removed": len(removed)}
+
+    def _rebuild(self) -> None:
+        by_address, by_name, by_fingerprint = {}, {}, {}
+        for rel in sorted(self._files):
+            for d in self._files[rel].declarations:
+                by_address.setdefault((d.directory, d.address), []).append(d)
+                by_name.setdefault(d.address, []).append(d)
+                if d.kind in EQUIVALENT_KINDS:
+                    by_fingerprint.setdefault(d.fingerprint, []).append(d)
+        self._by_address, self._by_name, self._by_fingerprint = by_address, by_name, by_fingerprint
+
+    def relative_path(self, path: str) -> Optional[str]:
+        """A repo or absolute path relative to the index base, or None if it lies outside it."""
+        rel = os.path.relpath(os.path.abspath(path), os.path.abspath(self.base))
+        return None if rel.startswith("..") else rel
+
+    def lookup(self, address: str, directory: str = None) -> list:
+        """Declarations of an address, in one directory or across the whole tree."""
+        if directory is not None:
+            return list(self._by_address.get((directory, address), []))
+        return list(self._by_name.get(address, []))
+
+    def collisions(self) -> list:
+        """Addresses declared more than once within the same directory (terraform rejects these)."""
+        return [decls for decls in self._by_address.values() if len(decls) > 1]
+
+    def duplicates(self) -> list:
+        """Groups of resources/modules with identical configuration under different (or the same) labels."""
+        return [decls for decls in self._by_fingerprint.values() if len(decls) > 1]
+
+    def check(self, content: str, path: str = None) -> dict:
+        """Compare a proposed file against the tree before it is committed.
+
+        With a `path` inside the tree, `collisions` are addresses another file in
+        the same directory already declares; without one, they are the same
+        addresses anywhere. `equivalents` pairs each new resource/module with
+        existing declarations of the same configuration.
+        """
+        rel = self.relative_path(path) if path else None
+        proposed = parse_declarations(content, rel or "<proposed>")
+        collisions, equivalents = [], []
+        for d in proposed:
+            existing = self.lookup(d.address, d.directory if rel else None)
+            existing = [e for e in existing if e.file != rel]
+            # Outside a directory, a shared data source (e.g. the AMI lookup) is not a conflict
+            if existing and (rel or d.kind != "data"):
+                collisions.append((d, existing))
+            if d.kind in EQUIVALENT_KINDS:
+                same = [e for e in self._by_fingerprint.get(d.fingerprint, []) if e.file != rel]
+                if same:
+                    equivalents.append((d, same))
+        return {"declarations": proposed, "collisions": collisions, "equivalents": equivalents}
+
+
+resource_index = ResourceIndex()
@@ -0,0 +1,220 @@
+"""Terraform Plan Summary - streaming parser for `terraform show -json` output"""
+
+import json
+import re
+from collections import Counter
+from typing import IO, Iterator, NamedTuple, Optional
+
+_NON_WS = re.compile(r"\S")
+_SCALAR_END = re.compile(r"[\s,\]}]")
+_STRUCTURAL = re.compile(r'["{}\[\]]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+# Terraform reports a replacement as a delete/create pair in either order
+_REPLACE_ACTIONS = (("delete", "create"), ("create", "delete"))
+
+
+class ResourceChange(NamedTuple):
+    address: str
+    type: str
+    action: str
+    replace_paths: tuple
+    reason: Optional[str]
+
+
+class PlanSummary(NamedTuple):
+    terraform_version: Optional[str]
+    counts: dict
+    changes: tuple
+    output_changes: dict
+    errored: bool
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.changes or any(a != "no-op" for a in self.output_changes.values()))
+
+    def totals(self) -> dict:
+        """Counts in the shape of terraform's "Plan: N to add, N to change, N to destroy" line."""
+        c = self.counts
+        return {
+            "add": c.get("create", 0) + c.get("replace", 0),
+            "change": c.get("update", 0),
+            "destroy": c.get("delete", 0) + c.get("replace", 0)
+        }
+
+
+class _JSONReader:
+    """Pull reader over a JSON document read in chunks.
+
+    Walks the outer structure without decoding it, so large sections we don't
+    need (prior_state, planned_values, configuration) are skipped rather than
+    built in memory; only the values asked for are decoded, one at a time.
+    """
+
+    def __init__(self, fp: IO[str], chunk_size: int = 1 << 16):
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._buf = ""
+        self._pos = 0
+
+    def _fill(self, keep_from: int) -> bool:
+        """Drop the buffer before `keep_from` and append the next chunk; offsets shift by `keep_from`."""
+        data = self._fp.read(self._chunk_size)
+        if not data:
+            return False
+        self._buf = self._buf[keep_from:] + data
+        self._pos = max(self._pos - keep_from, 0)
+        return True
+
+    def peek(self) -> str:
+        while True:
+            m = _NON_WS.search(self._buf, self._pos)
+            if m:
+                self._pos = m.start()
+                return self._buf[self._pos]
+            if not self._fill(len(self._buf)):
+                return ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"Malformed plan JSON: expected '{char}'")
+        self._pos += 1
+
+    def _scan(self, keep: bool) -> tuple[int, int]:
+        """(start, end) buffer offsets of the next value, reading more as needed."""
+        first = self.peek()
+        start = self._pos
+        if first not in '{["':
+            while True:
+                m = _SCALAR_END.search(self._buf, start)
+                if m:
+                    return start, m.start()
+                if not self._fill(start):
+                    return start, len(self._buf)
+                start = 0
+
+        depth, in_string, i = 0, False, start
+        while True:
+            m = (_STRING_SPECIAL if in_string else _STRUCTURAL).search(self._buf, i)
+            if m is None:
+                keep_from = start if keep else min(i, len(self._buf))
+                if not self._fill(keep_from):
+                    raise ValueError("Malformed plan JSON: unexpected end of input")
+                i -= keep_from
+                start -= keep_from
+                continue
+            char, i = m.group(), m.end()
+            if in_string:
+                if char == "\\":
+                    i += 1
+                else:
+                    in_string = False
+                    if depth == 0:
+                        return start, i
+            elif char == '"':
+                in_string = True
+            elif char in "{[":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return start, i
+
+    def value(self):
+        start, end = self._scan(keep=True)
+        self._pos = end
+        return json.loads(self._buf[start:end])
+
+    def skip(self) -> None:
+        _, self._pos = self._scan(keep=False)
+
+    def _separator(self, close: str) -> bool:
+        """Consume ',' or the closing bracket; True while more members follow."""
+        char = self.peek()
+        self._pos += 1
+        if char == close:
+            return False
+        if char != ",":
+            raise ValueError(f"Malformed plan JSON: unexpected '{char}'")
+        return True
+
+    def keys(self) -> Iterator[str]:
+        """Iterate an object's keys; the caller must consume each value with value() or skip()."""
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if not self._separator("}"):
+                return
+
+    def elements(self) -> Iterator:
+        """Decode an array one element at a time."""
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self.value()
+            if not self._separator("]"):
+                return
+
+
+def _action(actions: list) -> str:
+    if tuple(actions) in _REPLACE_ACTIONS:
+        return "replace"
+    return actions[0] if len(actions) == 1 else "-".join(actions)
+
+
+def _format_path(path: list) -> str:
+    # ["tags", "Name"] -> tags.Name, ["ingress", 0, "cidr_blocks"] -> ingress[0].cidr_blocks
+    text = ""
+    for step in path:
+        text += f"[{step}]" if isinstance(step, int) else (f".{step}" if text else str(step))
+    return text
+
+
+def _resource_change(rc: dict) -> ResourceChange:
+    change = rc.get("change", {})
+    return ResourceChange(
+        address=rc.get("address"),
+        type=rc.get("type"),
+        action=_action(change.get("actions", ["no-op"])),
+        replace_paths=tuple(_format_path(p) for p in change.get("replace_paths", [])),
+        reason=rc.get("action_reason")
+    )
+
+
+def parse_plan_json(fp: IO[str]) -> PlanSummary:
+    """Summarise a JSON plan read from `fp` without loading the whole document."""
+    reader = _JSONReader(fp)
+    version, errored = None, False
+    counts, changes, outputs = Counter(), [], {}
+
+    for key in reader.keys():
+        if key == "terraform_version":
+            version = reader.value()
+        elif key == "errored":
+            errored = bool(reader.value())
+        elif key == "resource_changes":
+            for rc in reader.elements():
+                change = _resource_change(rc)
+                counts[change.action] += 1
+                if change.action != "no-op":
+                    changes.append(change)
+        elif key == "output_changes":
+            for name in reader.keys():
+                outputs[name] = _action(reader.value().get("actions", ["no-op"]))
+        else:
+            reader.skip()
+
+    return PlanSummary(terraform_version=version, counts=dict(counts), changes=tuple(changes),
+                       output_changes=outputs, errored=errored)
+
+
+def parse_plan_file(path: str) -> PlanSummary:
+    with open(path, encoding="utf-8") as fp:
+        return parse_plan_json(fp)
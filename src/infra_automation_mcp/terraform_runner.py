@@ -0,0 +1,108 @@
+"""Multi-Root Terraform Runner - plan every root under terraform/ in parallel"""
+
+import asyncio
+import os
+import re
+import time
+from pathlib import Path
+from typing import Optional
+
+from infra_automation_mcp.terraform_client import TerraformClient, TerraformError
+
+# "Plan: 1 to add, 0 to change, 0 to destroy." / "No changes."
+_PLAN_COUNTS = re.compile(r"Plan: (\d+) to add, (\d+) to change, (\d+) to destroy")
+
+
+def discover_roots(base: str = None) -> list:
+    """Every directory under `base` holding .tf files directly, relative to `base`."""
+    base = Path(base or os.getenv("TERRAFORM_WORKING_DIR", "terraform"))
+    roots = []
+    for dirpath, dirnames, filenames in os.walk(base):
+        # Skip .terraform/ (downloaded modules) and .terraform-logs/
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        if any(f.endswith(".tf") for f in filenames):
+            roots.append(str(Path(dirpath).relative_to(base)))
+    return roots
+
+
+def _plan_counts(output: str) -> Optional[dict]:
+    match = _PLAN_COUNTS.search(output)
+    if match:
+        return dict(zip(("add", "change", "destroy"), map(int, match.groups())))
+    if "No changes." in output:
+        return {"add": 0, "change": 0, "destroy": 0}
+    return None
+
+
+async def _change_counts(tf: TerraformClient, output: str) -> Optional[dict]:
+    # Prefer the JSON plan; the text summary line is the fallback if `show -json` fails
+    try:
+        return (await tf.plan_summary()).totals()
+    except (TerraformError, ValueError):
+        return _plan_counts(output)
+
+
+async def _plan_root(base: Path, root: str, workers: asyncio.Semaphore, init_lock: asyncio.Lock,
+                     timeout: float) -> dict:
+    tf = TerraformClient(working_dir=str(base / root))
+    result = {"root": root, "status": "error", "changes": None, "output": "", "log": None, "seconds": 0.0}
+    async with workers:
+        started = time.monotonic()
+        try:
+            # The provider plugin cache is not safe for concurrent writers, so only an
+            # init that has providers to download waits for the others
+            if await asyncio.to_thread(tf.plugin_cache_ready):
+                ok, output = await tf.init()
+            else:
+                async with init_lock:
+                    ok, output = await tf.init()
+            if not ok:
+                result.update(status="init_failed", output=output)
+            else:
+                ok, output = await tf.plan(timeout=timeout)
+                result.update(status="ok" if ok else "plan_failed", output=output)
+                if ok:
+                    result["changes"] = await _change_counts(tf, output)
+        except TerraformError as e:
+            result["output"] = str(e) + (f"\n{e.output}" if e.output else "")
+        result["log"] = tf.last_log_path
+        result["seconds"] = round(time.monotonic() - started, 1)
+    return result
+
+
+async def plan_all(roots: list = None, base: str = None, workers: int = None, timeout: float = 600) -> list:
+    """Plan several Terraform roots concurrently, each in its own terraform process.
+
+    Roots default to everything `discover_roots` finds; any other root raises
+    ValueError, so a caller cannot point terraform at an arbitrary directory.
+    At most `workers` (TERRAFORM_PLAN_WORKERS) plans run at once; a failing
+    root is reported in its own result and does not stop the others.
+    """
+    base = Path(base or os.getenv("TERRAFORM_WORKING_DIR", "terraform"))
+    known = discover_roots(str(base))
+    if roots is None:
+        roots = known
+    else:
+        roots = [os.path.normpath(r) for r in roots]
+        unknown = [r for r in roots if r not in known]
+        if unknown:
+            raise ValueError(f"Not a Terraform root under {base}: {', '.join(unknown)}")
+    workers = workers or int(os.getenv("TERRAFORM_PLAN_WORKERS", "4"))
+    semaphore = asyncio.Semaphore(workers)
+    init_lock = asyncio.Lock()
+    return list(await asyncio.gather(*(_plan_root(base, r, semaphore, init_lock, timeout) for r in roots)))
+
+
+def merge_plan_results(results: list) -> dict:
+    """Totals across roots plus the roots that have changes or failed."""
+    totals = {"add": 0, "change": 0, "destroy": 0}
+    changed, failed = [], []
+    for r in results:
+        if r["status"] != "ok":
+            failed.append(r["root"])
+            continue
+        if r["changes"] and any(r["changes"].values()):
+            changed.append(r["root"])
+            for k in totals:
+                totals[k] += r["changes"][k]
+    return {"roots": len(results), "changed": changed, "failed": failed, **totals}
@@ -0,0 +1,192 @@
+"""Terraform State Index - resources by address, type and tag, cached per state serial"""
+
+import asyncio
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Optional
+
+from infra_automation_mcp.cache import cache
+from infra_automation_mcp.terraform_client import TerraformClient
+
+# serial and lineage sit at the top of every state file, ahead of outputs and resources
+_STATE_HEAD = 4096
+_SERIAL = re.compile(r'"serial"\s*:\s*(\d+)')
+_LINEAGE = re.compile(r'"lineage"\s*:\s*"([^"]*)"')
+
+
+def _read_identity(path: Path) -> Optional[tuple]:
+    """(lineage, serial) of a raw state file, or None if there is no state yet."""
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as f:
+        head = f.read(_STATE_HEAD)
+    serial, lineage = _SERIAL.search(head), _LINEAGE.search(head)
+    if serial and lineage:
+        return lineage.group(1), int(serial.group(1))
+    state = json.loads(path.read_text(encoding="utf-8"))
+    return state.get("lineage"), state.get("serial")
+
+
+def _local_state_path(working_dir: str) -> Optional[Path]:
+    """Path of the local state file, or None when a remote backend holds the state."""
+    root = Path(working_dir)
+    backend_file = root / ".terraform" / "terraform.tfstate"
+    if backend_file.exists():
+        backend = json.loads(backend_file.read_text()).get("backend") or {}
+        if backend.get("type", "local") != "local":
+            return None
+        path = (backend.get("config") or {}).get("path")
+        if path:
+            return root / path
+
+    workspace_file = root / ".terraform" / "environment"
+    workspace = workspace_file.read_text().strip() if workspace_file.exists() else "default"
+    if workspace != "default":
+        return root / "terraform.tfstate.d" / workspace / "terraform.tfstate"
+    return root / "terraform.tfstate"
+
+
+async def state_identity(tf: TerraformClient) -> Optional[tuple]:
+    """(lineage, serial) of the current state.
+
+    Local state is read directly, which costs one small file read. Remote state
+    has to be pulled, so that check goes through the shared TTL cache.
+    """
+    local = _local_state_path(tf.working_dir)
+    if local is not None:
+        return await asyncio.to_thread(_read_identity, local)
+
+    async def pull() -> Optional[tuple]:
+        path = await tf.pull_state()
+        try:
+            return await asyncio.to_thread(_read_identity, path)
+        finally:
+            path.unlink(missing_ok=True)
+
+    key = ("terraform", "state_identity", os.path.realpath(tf.working_dir))
+    return await cache.get_or_load(key, pull)
+
+
+def _walk_modules(module: dict):
+    yield from module.get("resources", [])
+    for child in module.get("child_modules", []):
+        yield from _walk_modules(child)
+
+
+def _redact(values: Any, mask: Any) -> Any:
+    """Replace every attribute that `sensitive_values` marks true with "(sensitive)"."""
+    if mask is True:
+        return "(sensitive)"
+    if isinstance(values, dict) and isinstance(mask, dict):
+        return {k: _redact(v, mask.get(k)) for k, v in values.items()}
+    if isinstance(values, list) and isinstance(mask, list):
+        return [_redact(v, mask[i] if i < len(mask) else None) for i, v in enumerate(values)]
+    return values
+
+
+def _lookup(values: Any, path: str) -> Any:
+    # "tags.Name", "ebs_block_device.0.volume_size"
+    for step in path.split("."):
+        if isinstance(values, list) and step.isdigit() and int(step) < len(values):
+            values = values[int(step)]
+        elif isinstance(values, dict) and step in values:
+            values = values[step]
+        else:
+            raise KeyError(path)
+    return values
+
+
+class StateIndex:
+    """Resources from `terraform show -json`, indexed by address, type and tag.
+
+    Built once per (lineage, serial); every lookup afterwards is a dict access.
+    Attributes the provider marks sensitive are redacted as the index is built,
+    so no lookup can return them.
+    """
+
+    def __init__(self, state: dict, identity: Optional[tuple] = None):
+        self.identity = identity
+        self.terraform_version = state.get("terraform_version")
+        values = state.get("values") or {}
+        self.outputs = {
+            name: "(sensitive)" if o.get("sensitive") else o.get("value")
+            for name, o in (values.get("outputs") or {}).items()
+        }
+        self.by_address: dict[str, dict] = {}
+        self.by_type: dict[str, list] = {}
+        self.by_tag: dict[tuple, list] = {}
+
+        for r in _walk_modules(values.get("root_module") or {}):
+            r = {**r, "values": _redact(r.get("values") or {}, r.get("sensitive_values"))}
+            address = r["address"]
+            self.by_address[address] = r
+            self.by_type.setdefault(r["type"], []).append(address)
+            attrs = r.get("values") or {}
+            tags = attrs.get("tags_all") or attrs.get("tags")
+            if isinstance(tags, dict):
+                for k, v in tags.items():
+                    self.by_tag.setdefault((k, None), []).append(address)
+                    self.by_tag.setdefault((k, v), []).append(address)
+
+    @classmethod
+    def from_file(cls, path: str, identity: Optional[tuple] = None) -> "StateIndex":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f), identity)
+
+    def get(self, address: str) -> Optional[dict]:
+        return self.by_address.get(address)
+
+    def of_type(self, resource_type: str) -> list:
+        return [self.by_address[a] for a in self.by_type.get(resource_type, [])]
+
+    def with_tag(self, key: str, value: str = None) -> list:
+        return [self.by_address[a] for a in self.by_tag.get((key, value), [])]
+
+    def attribute(self, address: str, path: str) -> Any:
+        """Attribute of a resource by dotted path; raises KeyError if either is missing."""
+        resource = self.by_address.get(address)
+        if resource is None:
+            raise KeyError(address)
+        return _lookup(resource.get("values") or {}, path)
+
+    def find(self, resource_type: str = None, tag: tuple = None) -> list:
+        """Resources matching every given filter; `tag` is (key, value or None)."""
+        addresses = list(self.by_address)
+        if resource_type:
+            addresses = self.by_type.get(resource_type, [])
+        if tag:
+            tagged = set(self.by_tag.get(tag, []))
+            addresses = [a for a in addresses if a in tagged]
+        return [self.by_address[a] for a in addresses]
+
+    def summary(self) -> dict:
+        return {t: len(a) for t, a in sorted(self.by_type.items())}
+
+
+_indexes: dict[str, StateIndex] = {}
+_build_locks: dict[str, asyncio.Lock] = {}
+
+
+async def load_state_index(tf: TerraformClient) -> StateIndex:
+    """Return the index for a working dir, rebuilding it only when the state serial or lineage moved."""
+    key = os.path.realpath(tf.working_dir)
+    identity = await state_identity(tf)
+    index = _indexes.get(key)
+    if index is not None and index.identity == identity:
+        return index
+
+    lock = _build_locks.setdefault(key, asyncio.Lock())
+    async with lock:
+        index = _indexes.get(key)
+        if index is not None and index.identity == identity:
+            return index
+        path = await tf.show_state_json()
+        try:
+            index = await asyncio.to_thread(StateIndex.from_file, str(path), identity)
+        finally:
+            # State JSON carries secrets in plain text; keep only the in-memory index
+            path.unlink(missing_ok=True)
+        _indexes[key] = index
+        return index
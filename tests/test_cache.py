@@ -0,0 +1,65 @@
+"""TTLCache expiry, invalidation and shared loads"""
+
+import asyncio
+
+from infra_automation_mcp import cache as cache_module
+from infra_automation_mcp.cache import TTLCache
+
+
+def test_entries_expire_after_their_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    c = TTLCache(ttls={("okta", "users"): 10}, default_ttl=60)
+    c.set(("okta", "users", "a"), 1)
+    c.set(("okta", "groups", "a"), 2)
+    now[0] += 11
+    assert c.get(("okta", "users", "a")) == (False, None)
+    assert c.get(("okta", "groups", "a")) == (True, 2)
+
+
+def test_invalidate_drops_by_prefix():
+    c = TTLCache()
+    c.set(("okta", "users", "a"), 1)
+    c.set(("okta", "users", "b"), 2)
+    c.set(("okta", "groups", "a"), 3)
+    assert c.invalidate("okta", "users") == 2
+    assert c.get(("okta", "users", "a"))[0] is False
+    assert c.get(("okta", "groups", "a")) == (True, 3)
+
+
+def test_concurrent_misses_share_one_load():
+    c = TTLCache()
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def main():
+        return await asyncio.gather(*(c.get_or_load(("k",), load) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["value"] * 5
+    assert calls == 1
+
+
+def test_cancelled_loader_does_not_cancel_waiters():
+    c = TTLCache()
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return calls
+
+    async def main():
+        first = asyncio.create_task(c.get_or_load(("k",), load))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(c.get_or_load(("k",), load))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await waiter
+
+    assert asyncio.run(main()) == 2
@@ -0,0 +1,53 @@
+"""Batch rendering order and resource name collisions"""
+
+import os
+
+import pytest
+
+from infra_automation_mcp import hcl_render
+from infra_automation_mcp.terraform_client import TerraformClient
+
+
+def _user(email):
+    return {"email": email, "first_name": "Test", "last_name": "User"}
+
+
+def test_colliding_names_raise_before_rendering():
+    rendered = []
+
+    def render(**record):
+        rendered.append(record)
+        return ""
+
+    with pytest.raises(ValueError, match="a_b_x_com"):
+        hcl_render.render_batch(render, [_user("a.b@x.com"), _user("a_b@x.com")], "email")
+    assert rendered == []
+
+
+def test_batch_output_is_sorted_by_resource_name():
+    users = [_user("zoe@x.com"), _user("Adam@x.com"), _user("mia@x.com")]
+    blocks = list(hcl_render.render_okta_users(users))
+    assert [b.split('"')[3] for b in blocks if b.startswith("# Okta User")] == \
+        ["adam_x_com", "mia_x_com", "zoe_x_com"]
+    assert blocks == list(hcl_render.render_okta_users(reversed(users)))
+
+
+def test_write_blocks_leaves_no_file_on_collision(tmp_path):
+    tf = TerraformClient(str(tmp_path))
+    with pytest.raises(ValueError):
+        tf.write_blocks("users.tf", hcl_render.render_okta_users([_user("a.b@x.com"), _user("a_b@x.com")]))
+    assert os.listdir(tmp_path) == []
+
+
+def test_write_blocks_leaves_no_file_on_render_error(tmp_path):
+    def blocks():
+        yield hcl_render.okta_group("platform")
+        raise RuntimeError("template failed")
+
+    tf = TerraformClient(str(tmp_path))
+    with pytest.raises(RuntimeError):
+        tf.write_blocks("groups.tf", blocks())
+    assert os.listdir(tmp_path) == []
+
+    path, count = tf.write_blocks("groups.tf", hcl_render.render_okta_groups([{"name": "platform"}]))
+    assert count == 1 and os.listdir(tmp_path) == ["groups.tf"]
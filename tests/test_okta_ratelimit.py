@@ -0,0 +1,51 @@
+"""Okta rate-limit buckets: AIMD concurrency and quota pacing"""
+
+import time
+
+from infra_automation_mcp.okta_ratelimit import RateLimitBucket, RateLimitScheduler, bucket_key
+
+
+def _headers(limit: int, remaining: int, reset_in: float = 60) -> dict:
+    return {"X-Rate-Limit-Limit": str(limit), "X-Rate-Limit-Remaining": str(remaining),
+            "X-Rate-Limit-Reset": str(time.time() + reset_in)}
+
+
+def test_bucket_key_groups_ids_and_subresources():
+    assert bucket_key("/api/v1/users") == "/api/v1/users"
+    assert bucket_key("/api/v1/users/00u1/groups?limit=200") == "/api/v1/users/{id}"
+    assert bucket_key("https://example.okta.com/api/v1/groups/00g1/users") == "/api/v1/groups/{id}"
+
+
+def test_concurrency_grows_by_one_after_a_healthy_window():
+    bucket = RateLimitBucket("/api/v1/users", max_concurrency=8, headroom=0.1)
+    assert bucket.concurrency == 4
+    for _ in range(4):
+        bucket.update(200, _headers(600, 500))
+    assert bucket.concurrency == 5
+    for _ in range(100):
+        bucket.update(200, _headers(600, 500))
+    assert bucket.concurrency == 8
+
+
+def test_concurrency_halves_on_429_and_low_quota():
+    bucket = RateLimitBucket("/api/v1/users", max_concurrency=8, headroom=0.1)
+    bucket.update(429, _headers(600, 0))
+    assert bucket.concurrency == 2
+    bucket.update(200, _headers(600, 100))  # at or below twice the 60-request reserve
+    assert bucket.concurrency == 1
+    bucket.update(429, {})
+    assert bucket.concurrency == 1
+
+
+def test_pacing_waits_for_reset_only_inside_the_reserve():
+    bucket = RateLimitBucket("/api/v1/users", max_concurrency=8, headroom=0.1)
+    bucket.update(200, _headers(600, 300, reset_in=30))
+    assert bucket._pacing_delay() == 0.0
+    bucket.update(200, _headers(600, 50, reset_in=30))
+    assert 29 < bucket._pacing_delay() <= 30.25
+
+
+def test_scheduler_shares_one_bucket_per_endpoint_family():
+    scheduler = RateLimitScheduler(max_concurrency=4, max_retries=1, headroom=0.1)
+    assert scheduler.bucket_for("/api/v1/users/a") is scheduler.bucket_for("/api/v1/users/b/groups")
+    assert scheduler.bucket_for("/api/v1/users") is not scheduler.bucket_for("/api/v1/users/a")
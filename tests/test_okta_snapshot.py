@@ -0,0 +1,103 @@
+"""Okta snapshot full and delta sync"""
+
+import asyncio
+
+from infra_automation_mcp.okta_snapshot import OktaSnapshot
+
+LATER = "2999-01-01T00:00:00.000Z"
+
+
+def _user(user_id, status="ACTIVE"):
+    return {"id": user_id, "status": status, "lastUpdated": LATER,
+            "profile": {"login": f"{user_id}@example.com", "email": f"{user_id}@example.com"}}
+
+
+def _group(group_id, membership_updated="2020-01-01T00:00:00.000Z"):
+    return {"id": group_id, "type": "OKTA_GROUP", "lastUpdated": "2020-01-01T00:00:00.000Z",
+            "lastMembershipUpdated": membership_updated, "profile": {"name": group_id}}
+
+
+async def _iterate(records):
+    for record in records:
+        yield record
+
+
+class FakeOkta:
+    """Serves canned pages and records which endpoints a sync touched."""
+
+    def __init__(self, users, groups, members, apps=(), app_users=None):
+        self.users, self.groups, self.members = users, groups, members
+        self.apps, self.app_users = list(apps), app_users or {}
+        self.calls = []
+
+    def iter_users(self, search=None):
+        self.calls.append(("users", search))
+        return _iterate(self.users)
+
+    def iter_groups(self, expression=None):
+        self.calls.append(("groups", expression))
+        return _iterate(self.groups)
+
+    def iter_group_members(self, group_id):
+        self.calls.append(("members", group_id))
+        return _iterate({"id": u} for u in self.members.get(group_id, []))
+
+    def iter_apps(self):
+        self.calls.append(("apps", None))
+        return _iterate(self.apps)
+
+    def iter_app_users(self, app_id):
+        self.calls.append(("app_users", app_id))
+        return _iterate({"id": u} for u in self.app_users.get(app_id, []))
+
+
+def _full_client():
+    return FakeOkta(
+        users=[_user("alice"), _user("bob")],
+        groups=[_group("eng"), _group("ops")],
+        members={"eng": ["alice", "bob"], "ops": ["bob"]},
+        apps=[{"id": "aws", "label": "AWS", "status": "ACTIVE"}],
+        app_users={"aws": ["alice"]}
+    )
+
+
+def test_delta_sync_replaces_only_changed_memberships(tmp_path):
+    snapshot = OktaSnapshot(str(tmp_path / "snapshot.db"))
+    stats = asyncio.run(snapshot.sync(_full_client()))
+    assert stats["mode"] == "full"
+    assert [g["id"] for g in snapshot.user_groups("bob")] == ["eng", "ops"]
+    assert [a["id"] for a in snapshot.user_apps("alice")] == ["aws"]
+
+    # bob left eng; ops reports no membership change and must not be re-read
+    delta = FakeOkta(users=[_user("bob", status="SUSPENDED")],
+                     groups=[_group("eng", membership_updated=LATER), _group("ops")],
+                     members={"eng": ["alice"], "ops": []})
+    stats = asyncio.run(snapshot.sync(delta))
+
+    assert stats["mode"] == "delta"
+    assert ("members", "eng") in delta.calls
+    assert ("members", "ops") not in delta.calls
+    assert not [c for c in delta.calls if c[0] in ("apps", "app_users")]
+    assert delta.calls[0][1].startswith("lastUpdated gt ")
+    assert [g["id"] for g in snapshot.user_groups("bob")] == ["ops"]
+    assert [g["id"] for g in snapshot.user_groups("alice")] == ["eng"]
+    assert snapshot.find_user("BOB@example.com")["status"] == "SUSPENDED"
+    # app assignments survive a delta sync that skips them
+    assert [a["id"] for a in snapshot.user_apps("alice")] == ["aws"]
+    snapshot.close()
+
+
+def test_full_sync_without_apps_clears_app_rows(tmp_path):
+    snapshot = OktaSnapshot(str(tmp_path / "snapshot.db"))
+    asyncio.run(snapshot.sync(_full_client()))
+    assert snapshot.freshness()["last_apps_sync"] is not None
+
+    client = _full_client()
+    stats = asyncio.run(snapshot.sync(client, full=True, include_apps=False))
+
+    assert stats == {"mode": "full", "users": 2, "groups": 2, "memberships": 3, "apps": 0}
+    assert ("apps", None) not in client.calls
+    freshness = snapshot.freshness()
+    assert freshness["apps"] == 0 and freshness["app_assignments"] == 0
+    assert freshness["last_apps_sync"] is None
+    snapshot.close()
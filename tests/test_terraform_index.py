@@ -0,0 +1,37 @@
+"""Fingerprinting in the Terraform declaration index"""
+
+from infra_automation_mcp import hcl_render
+from infra_automation_mcp.terraform_index import parse_declarations
+
+
+def _fingerprints(text: str) -> dict:
+    return {d.address: d.fingerprint for d in parse_declarations(text, "iam/test.tf")}
+
+
+def test_attachments_to_different_groups_do_not_match():
+    text = '''
+resource "aws_iam_group_policy_attachment" "developers_policy" {
+  group      = aws_iam_group.developers.name
+  policy_arn = "arn:aws:iam::aws:policy/PowerUserAccess"
+}
+
+resource "aws_iam_group_policy_attachment" "security_engineers_policy" {
+  group      = aws_iam_group.security_engineers.name
+  policy_arn = "arn:aws:iam::aws:policy/PowerUserAccess"
+}
+'''
+    fp = _fingerprints(text)
+    assert fp["aws_iam_group_policy_attachment.developers_policy"] != \
+        fp["aws_iam_group_policy_attachment.security_engineers_policy"]
+
+
+def test_instances_differing_only_by_own_name_match():
+    first = _fingerprints(hcl_render.ec2_free_tier("alex-dev-box"))
+    second = _fingerprints(hcl_render.ec2_free_tier("dev-workstation-alex"))
+    assert first["aws_instance.alex_dev_box"] == second["aws_instance.dev_workstation_alex"]
+
+
+def test_groups_with_different_names_do_not_match():
+    first = _fingerprints(hcl_render.okta_group("IT-Engineering"))
+    second = _fingerprints(hcl_render.okta_group("Security-Engineering"))
+    assert first["okta_group.it_engineering"] != second["okta_group.security_engineering"]
@@ -0,0 +1,79 @@
+"""Streaming plan parser across chunk boundaries"""
+
+import io
+import json
+
+import pytest
+
+from infra_automation_mcp import terraform_plan
+from infra_automation_mcp.terraform_plan import _JSONReader, parse_plan_file, parse_plan_json
+
+PLAN = {
+    "format_version": "1.2",
+    "terraform_version": "1.6.0",
+    "planned_values": {"root_module": {"resources": [{"values": {"note": "skip \"me\" ]}{["}}]}},
+    "resource_changes": [
+        {
+            "address": "aws_s3_bucket.logs",
+            "type": "aws_s3_bucket",
+            "change": {"actions": ["create"], "after": {"bucket": "logs-\u00e9t\u00e9-\u2603", "path": "C:\\tmp\\"}}
+        },
+        {
+            "address": "aws_instance.web",
+            "type": "aws_instance",
+            "change": {"actions": ["delete", "create"], "replace_paths": [["ami"], ["ebs_block_device", 0, "size"]]},
+            "action_reason": "replace_because_cannot_update"
+        },
+        {"address": "aws_iam_role.ci", "type": "aws_iam_role", "change": {"actions": ["no-op"]}}
+    ],
+    "output_changes": {"bucket_arn": {"actions": ["create"]}, "unchanged": {"actions": ["no-op"]}},
+    "prior_state": {"values": {"outputs": {"quote": {"value": "a \\\" b } ]"}}}},
+    "errored": False
+}
+
+
+@pytest.fixture(params=[1, 2, 3, 7, 64, 1 << 16])
+def chunk_size(request, monkeypatch):
+    class Reader(_JSONReader):
+        def __init__(self, fp):
+            super().__init__(fp, chunk_size=request.param)
+    monkeypatch.setattr(terraform_plan, "_JSONReader", Reader)
+    return request.param
+
+
+def test_summary_is_independent_of_chunk_size(chunk_size):
+    summary = parse_plan_json(io.StringIO(json.dumps(PLAN, ensure_ascii=False)))
+    assert summary.terraform_version == "1.6.0"
+    assert summary.counts == {"create": 1, "replace": 1, "no-op": 1}
+    assert [c.address for c in summary.changes] == ["aws_s3_bucket.logs", "aws_instance.web"]
+    assert summary.changes[1].replace_paths == ("ami", "ebs_block_device[0].size")
+    assert summary.changes[1].reason == "replace_because_cannot_update"
+    assert summary.output_changes == {"bucket_arn": "create", "unchanged": "no-op"}
+    assert summary.totals() == {"add": 2, "change": 0, "destroy": 1}
+    assert not summary.errored
+
+
+def test_escaped_and_unicode_values_decode_intact():
+    doc = json.dumps({"a": "x\\\"}\u2603", "b": ["\\", "\"", "\u00e9"], "c": 1}, ensure_ascii=False)
+    for size in (1, 2, 5):
+        reader = _JSONReader(io.StringIO(doc), chunk_size=size)
+        assert {key: reader.value() for key in reader.keys()} == json.loads(doc)
+
+
+def test_empty_resource_changes(chunk_size):
+    summary = parse_plan_json(io.StringIO('{"resource_changes": [], "output_changes": {}, "errored": true}'))
+    assert summary.counts == {}
+    assert summary.changes == ()
+    assert not summary.has_changes
+    assert summary.errored
+
+
+def test_truncated_plan_is_rejected(chunk_size):
+    with pytest.raises(ValueError):
+        parse_plan_json(io.StringIO(json.dumps(PLAN)[:-40]))
+
+
+def test_parse_plan_file_reads_utf8(tmp_path):
+    path = tmp_path / "plan.json"
+    path.write_text(json.dumps(PLAN, ensure_ascii=False), encoding="utf-8")
+    assert parse_plan_file(str(path)).changes[0].address == "aws_s3_bucket.logs"
@@ -0,0 +1,36 @@
+"""Sensitive attribute redaction in the Terraform state index"""
+
+import json
+
+from infra_automation_mcp.terraform_state import StateIndex
+
+STATE = {
+    "terraform_version": "1.6.0",
+    "values": {
+        "outputs": {"db_password": {"sensitive": True, "value": "hunter2-output"}},
+        "root_module": {
+            "resources": [{
+                "address": "aws_db_instance.main",
+                "type": "aws_db_instance",
+                "values": {
+                    "id": "db-1",
+                    "password": "hunter2-password",
+                    "tags": {"Name": "main"},
+                    "users": [{"name": "app", "token": "hunter2-token"}]
+                },
+                "sensitive_values": {"password": True, "tags": {}, "users": [{"token": True}]}
+            }]
+        }
+    }
+}
+
+
+def test_sensitive_attributes_are_redacted():
+    index = StateIndex(STATE)
+    resource = index.get("aws_db_instance.main")
+    dumped = json.dumps([resource, index.outputs])
+    assert "hunter2" not in dumped
+    assert index.attribute("aws_db_instance.main", "password") == "(sensitive)"
+    assert index.attribute("aws_db_instance.main", "users.0.token") == "(sensitive)"
+    assert index.attribute("aws_db_instance.main", "users.0.name") == "app"
+    assert index.with_tag("Name", "main") == [resource]